@@ -1,73 +1,82 @@
 import os
-import subprocess
-import shutil
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from plsr.console import console
 
-try:
-    import tomllib
-except ImportError:
-    tomllib = None
-    try:
-        import tomli
-    except ImportError:
-        tomli = None
+@lru_cache(maxsize=1)
+def _cwd_resolved() -> Path:
+    # The CLI never chdirs, so one getcwd + realpath per process is enough.
+    return Path.cwd().resolve()
 
 def detect_app_root() -> Path:
+    """
+    APP_ROOT if it exists; otherwise walk up from CWD to the first directory
+    holding pyproject.toml or a .git entry (a file for linked worktrees).
+    Pure filesystem checks — no `git rev-parse` spawn.
+    """
     env_root = os.getenv("APP_ROOT")
     if env_root:
         p = Path(env_root)
         if p.is_dir():
             return p
-    if shutil.which("git"):
-        try:
-            result = subprocess.run(["git", "rev-parse", "--show-toplevel"],
-                                    capture_output=True, text=True, check=True)
-            git_root = result.stdout.strip()
-            if git_root:
-                return Path(git_root)
-        except subprocess.CalledProcessError:
-            pass
-    current = Path.cwd()
-    while True:
-        if (current / "pyproject.toml").exists():
-            return current
-        if current.parent == current:
-            break
-        current = current.parent
+    cur = _cwd_resolved()
+    for p in (cur, *cur.parents):
+        if (p / "pyproject.toml").exists() or (p / ".git").exists():
+            return p
     return Path.cwd()
 
+@lru_cache(maxsize=8)
+def _pyproject_name_version(path_str: str, mtime_ns: int) -> tuple[str, str]:
+    try:
+        import tomllib as _toml
+    except ImportError:
+        try:
+            import tomli as _toml
+        except ImportError:
+            _toml = None
+    try:
+        if _toml:
+            with open(path_str, "rb") as f:
+                data = _toml.load(f)
+        else:
+            data = {}
+    except Exception:
+        data = {}
+    project_data = data.get("project", {})
+    name = project_data.get("name", "")
+    version = project_data.get("version", "")
+    tool_data = data.get("tool", {})
+    poetry_data = tool_data.get("poetry", {}) if tool_data else {}
+    name = name or poetry_data.get("name", "")
+    version = version or poetry_data.get("version", "")
+    return name, version
+
 def read_app_metadata(app_root: Path):
     name = ""
     version = ""
     pyproject = app_root / "pyproject.toml"
     if pyproject.is_file():
-        try:
-            if tomllib:
-                data = tomllib.loads(pyproject.read_text())
-            elif tomli:
-                data = tomli.loads(pyproject.read_text())
-            else:
-                data = {}
-        except Exception:
-            data = {}
-        project_data = data.get("project", {})
-        name = project_data.get("name", "") or name
-        version = project_data.get("version", "") or version
-        tool_data = data.get("tool", {})
-        poetry_data = tool_data.get("poetry", {}) if tool_data else {}
-        name = name or poetry_data.get("name", "")
-        version = version or poetry_data.get("version", "")
+        name, version = _pyproject_name_version(str(pyproject), pyproject.stat().st_mtime_ns)
     if not name:
         name = app_root.name
     if not version:
         version = "0.0.0"
     return name, version
 
-def start(env_name: str | None = None):
+@dataclass
+class AppContext:
+    root: Path
+    name: str
+    version: str
+    env_name: str | None = None
+
+
+def start(env_name: str | None = None) -> AppContext:
     """
     Print app identity; if env_name given (via `plsr <env> start`), include it.
+    Returns the resolved context so follow-up steps can reuse it.
     """
     root = detect_app_root()
     app_name, app_version = read_app_metadata(root)
@@ -88,3 +97,4 @@ def start(env_name: str | None = None):
     console.info(f"Name:   {app_name}")
     console.info(f"Version:{app_version}")
     console.info(f"Root:   {root}")
+    return AppContext(root=root, name=app_name, version=app_version, env_name=env_name)
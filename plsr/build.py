@@ -5,18 +5,53 @@ import re
 import sys
 import shutil
 import subprocess
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+try:
+    import yaml as _yaml
+except ImportError:
+    _yaml = None
+
+from .app import _cwd_resolved
 from .console import console
-from .aws import (
-    preflight_aws_and_ecr,
-    ecr_login,
-    parse_ecr_image_ref,
-    ecr_image_exists,
-    ecr_ensure_repo,
-    ecr_delete_image_by_tag,
-)
+
+_RE_SCAN_KV = re.compile(r"""^([ \t]*)([^\s#'"][^:#]*?)\s*:(?:[ \t]+['"]?([^#'"]*?)['"]?)?\s*(?:#.*)?$""")
+_RE_SANITIZE = re.compile(r"[^a-zA-Z0-9_.-]+")
+_NAME_SAFE_DELETE = str.maketrans("", "", "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.-")
+_RE_PRIV_ECR = re.compile(r'([0-9]{12}\.dkr\.ecr\.[a-z0-9-]+\.amazonaws\.com)')
+_RE_PUB_ECR = re.compile(r'(public\.ecr\.aws/[A-Za-z0-9-]+)')
+_RE_ARG_KV = re.compile(r"(?m)^[ \t]+([A-Za-z_][A-Za-z0-9_]*)[ \t]*:[ \t]*['\"]?([^'\"#\r\n]+?)['\"]?[ \t]*(?:#.*)?$")
+_RE_TARGET_ITEM = re.compile(r"(?m)^[ \t]*-[ \t]*([A-Za-z0-9_.-]+)[ \t]*$")
+
+@lru_cache(maxsize=64)
+def _block_header(section: str) -> re.Pattern[str]:
+    return re.compile(rf"([ \t]*){re.escape(section)}[ \t]*:[ \t]*(?:#.*)?\r?\n?")
+
+@lru_cache(maxsize=64)
+def _kv_pattern(key: str) -> re.Pattern[str]:
+    return re.compile(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$")
+
+_BUILDX_OK: bool | None = None
+
+_ECR_LOGGED_IN: set[tuple[str, str]] = set()
+
+# (app_root, dockerfile, dest_ecr, push, pre_pull) -> monotonic time of last passing preflight
+_PREFLIGHT_CACHE: dict[tuple, float] = {}
+_PREFLIGHT_TTL_S = 300.0
+
+@lru_cache(maxsize=4)
+def _which(cmd: str) -> str | None:
+    return shutil.which(cmd)
+
+def _first_env(*keys: str) -> Optional[str]:
+    """
+    First non-empty value among the given environment variables.
+    """
+    environ = os.environ
+    return next((v for v in map(environ.get, keys) if v), None)
 
 def _find_app_root_for_config() -> Path:
     env_root = os.getenv("APP_ROOT")
@@ -25,33 +60,144 @@ def _find_app_root_for_config() -> Path:
         if (p / "config.yaml").is_file():
             return p
 
-    cur = Path.cwd().resolve()
+    cur = _cwd_resolved()
     for p in (cur, *cur.parents):
         if (p / "config.yaml").is_file():
             return p
     return cur
 
+@lru_cache(maxsize=8)
+def _read_text_config_cached(path_str: str, mtime_ns: int) -> str:
+    """
+    Read and decode config.yaml once per (path, mtime); an edit bumps the
+    mtime and therefore misses the cache.
+    """
+    try:
+        return Path(path_str).read_text(encoding="utf-8", errors="ignore")
+    except Exception:
+        return ""
+
 def _read_text_config(app_root: Path) -> str:
     cfg = app_root / "config.yaml"
-    if not cfg.is_file():
+    try:
+        st = os.stat(cfg)
+    except OSError:
         return ""
+    return _read_text_config_cached(str(cfg), st.st_mtime_ns)
+
+@lru_cache(maxsize=8)
+def _load_config_dict_cached(path_str: str, mtime_ns: int) -> dict | None:
+    """
+    Parse config.yaml once per (path, mtime). Uses PyYAML's (C)BaseLoader so
+    every scalar stays a string, exactly like the regex readers (no 1.10 -> 1.1).
+    Returns None when PyYAML is missing or the file is not a YAML mapping;
+    callers then fall back to the regex readers.
+    """
+    if _yaml is None:
+        return None
+    loader = getattr(_yaml, "CBaseLoader", None) or _yaml.BaseLoader
     try:
-        return cfg.read_text(encoding="utf-8", errors="ignore")
+        data = _yaml.load(_read_text_config_cached(path_str, mtime_ns), Loader=loader)
     except Exception:
-        return ""
+        return None
+    return data if isinstance(data, dict) else None
+
+def _load_config_dict(app_root: Path) -> dict | None:
+    cfg = app_root / "config.yaml"
+    try:
+        st = os.stat(cfg)
+    except OSError:
+        return None
+    return _load_config_dict_cached(str(cfg), st.st_mtime_ns)
+
+def _scan_config_text(text: str) -> Dict[str, str]:
+    """
+    Single pass over config.yaml collecting the scalar fields the build needs
+    (name, version, ECR, service.flavor, dockerfile) — the no-PyYAML fallback.
+    """
+    out: Dict[str, str] = {}
+    section = None
+    for line in text.splitlines():
+        m = _RE_SCAN_KV.match(line)
+        if not m:
+            continue
+        indent, key, val = m.group(1), m.group(2), (m.group(3) or "").strip()
+        if not indent:
+            section = None if val else key
+            if not val:
+                continue
+            if key in ("name", "version") or key.upper() == "ECR":
+                out.setdefault("ECR" if key.upper() == "ECR" else key, val)
+            elif key.lower() in ("dockerfile", "build.dockerfile"):
+                out.setdefault("dockerfile", val)
+        elif val and section == "service" and key == "flavor":
+            out.setdefault("flavor", val)
+        elif val and section == "build" and key.lower() == "dockerfile":
+            out.setdefault("dockerfile", val)
+    return out
+
+@lru_cache(maxsize=8)
+def _scan_config_cached(path_str: str, mtime_ns: int) -> Dict[str, str]:
+    return _scan_config_text(_read_text_config_cached(path_str, mtime_ns))
+
+def _scan_config(app_root: Path) -> Dict[str, str]:
+    cfg = app_root / "config.yaml"
+    try:
+        st = os.stat(cfg)
+    except OSError:
+        return {}
+    return _scan_config_cached(str(cfg), st.st_mtime_ns)
 
 def _kv_top(text: str, key: str) -> Optional[str]:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", text)
+    m = _kv_pattern(key).search(text)
     return m.group(1).strip() if m else None
 
 def _extract_block(text: str, section: str) -> str:
-    m = re.search(rf"(?ms)^\s*{re.escape(section)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", text)
-    return m.group("blk") if m else ""
+    """
+    Lines nested under `section:` — everything after the header that is blank
+    or indented deeper than it, up to the first dedent. A `- item` list at the
+    header's own indent also belongs to it. Linear, no backtracking.
+
+    >>> _extract_block("image:\\n  targets:\\n  - local\\n  - runtime\\nx: 1\\n", "targets")
+    '  - local\\n  - runtime\\n'
+    """
+    header = _block_header(section)
+    lines = text.splitlines(keepends=True)
+    start = indent = None
+    for i, line in enumerate(lines):
+        m = header.fullmatch(line)
+        if m:
+            start, indent = i + 1, len(m.group(1))
+            break
+    if start is None:
+        return ""
+    end = start
+    for line in lines[start:]:
+        stripped = line.lstrip(" \t")
+        depth = len(line) - len(stripped)
+        if stripped.strip() and (depth < indent or (depth == indent and stripped[:2].rstrip() != "-")):
+            break
+        end += 1
+    return "".join(lines[start:end])
 
 def _kv_from_block(block: str, key: str) -> Optional[str]:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", block)
+    m = _kv_pattern(key).search(block)
     return m.group(1).strip() if m else None
 
+def _cfg_get(cfg: dict | None, *path: str):
+    cur = cfg
+    for key in path:
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(key)
+    return cur
+
+def _cfg_str(cfg: dict | None, *path: str) -> Optional[str]:
+    val = _cfg_get(cfg, *path)
+    if not isinstance(val, str):
+        return None
+    return val.strip() or None
+
 def _read_fields_from_config_yaml(app_root: Path) -> tuple[str | None, str | None, str | None, str]:
     """
     Return (name, version, ecr_root, flavor).
@@ -65,33 +211,33 @@ def _read_fields_from_config_yaml(app_root: Path) -> tuple[str | None, str | Non
     if not text:
         return None, None, None, "python-app"
 
-    m_name = re.search(r'(?m)^\s*name\s*:\s*["\']?([^"\']+?)["\']?\s*$', text)
-    m_ver  = re.search(r'(?m)^\s*version\s*:\s*["\']?([^"\']+?)["\']?\s*$', text)
-    name = m_name.group(1).strip() if m_name else None
-    ver  = m_ver.group(1).strip() if m_ver else None
+    cfg = _load_config_dict(app_root)
+    if cfg is not None:
+        name = _cfg_str(cfg, "name")
+        ver  = _cfg_str(cfg, "version")
+        fl   = (_cfg_str(cfg, "service", "flavor") or "").lower()
+        ecr_explicit = _cfg_str(cfg, "ECR")
+        ecr = ecr_explicit.rstrip("/") if ecr_explicit else None
+    else:
+        fields = _scan_config(app_root)
+        name = fields.get("name") or None
+        ver  = fields.get("version") or None
+        fl   = fields.get("flavor", "").lower()
+        ecr  = fields.get("ECR", "").rstrip("/") or None
 
-    svc = _extract_block(text, "service")
-    fl  = (_kv_from_block(svc, "flavor") or "").lower().strip()
     flavor = "db-mariadb" if fl in ("mariadb", "mysql", "db-mariadb", "db_mysql") else "python-app"
 
-    m_ecr  = re.search(r'(?mi)^\s*ECR\s*:\s*["\']?([^"\']+?)["\']?\s*$', text)
-    ecr = m_ecr.group(1).strip().rstrip("/") if m_ecr else None
     if not ecr:
-        env = (
-            os.getenv("ECR")
-            or os.getenv("ECR_URL")
-            or os.getenv("AWS_ECR")
-            or os.getenv("AWS_ECR_URL")
-        )
+        env = _first_env("ECR", "ECR_URL", "AWS_ECR", "AWS_ECR_URL")
         if env:
             ecr = env.strip().rstrip("/")
 
     if not ecr:
-        m_priv = re.search(r'([0-9]{12}\.dkr\.ecr\.[a-z0-9-]+\.amazonaws\.com)', text)
+        m_priv = _RE_PRIV_ECR.search(text)
         if m_priv:
             ecr = m_priv.group(1).strip().rstrip("/")
         else:
-            m_pub = re.search(r'(public\.ecr\.aws/[A-Za-z0-9-]+)', text)
+            m_pub = _RE_PUB_ECR.search(text)
             if m_pub:
                 ecr = m_pub.group(1).strip().rstrip("/")
 
@@ -101,9 +247,15 @@ def _read_dockerfile_from_config_yaml(app_root: Path) -> str | None:
     text = _read_text_config(app_root)
     dockerfile = None
     if text:
-        m_df = re.search(r'(?mi)^\s*(?:build\.)?dockerfile\s*:\s*["\']?([^"\']+?)["\']?\s*$', text)
-        if m_df:
-            dockerfile = m_df.group(1).strip()
+        cfg = _load_config_dict(app_root)
+        if cfg is not None:
+            dockerfile = (
+                _cfg_str(cfg, "build", "dockerfile")
+                or _cfg_str(cfg, "build.dockerfile")
+                or _cfg_str(cfg, "dockerfile")
+            )
+        else:
+            dockerfile = _scan_config(app_root).get("dockerfile") or None
     if not dockerfile:
         candidate = app_root / "docker" / "Dockerfile"
         if candidate.is_file():
@@ -114,45 +266,90 @@ def _read_build_args_map(app_root: Path) -> Dict[str, str]:
     """
     Parse build.args: mapping into a dict of strings.
     """
+    cfg = _load_config_dict(app_root)
+    if cfg is not None:
+        args = _cfg_get(cfg, "build", "args")
+        if not isinstance(args, dict):
+            return {}
+        return {k: v.strip() for k, v in args.items() if isinstance(v, str)}
+
     text = _read_text_config(app_root)
     args_block = _extract_block(text, "build")
-    m = re.search(r"(?ms)^\s*args\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", args_block)
-    blk = m.group("blk") if m else ""
-    out: Dict[str, str] = {}
-    for line in (blk.splitlines() if blk else []):
-        m2 = re.match(r"^[ \t]+([A-Za-z_][A-Za-z0-9_]*)\s*:\s*['\"]?([^'\"]+)['\"]?\s*(?:#.*)?$", line)
-        if m2:
-            out[m2.group(1)] = m2.group(2).strip()
-    return out
+    blk = _extract_block(args_block, "args")
+    return {m2.group(1): m2.group(2).strip() for m2 in _RE_ARG_KV.finditer(blk)}
 
 def _read_targets_list(app_root: Path) -> List[str]:
     """
     Read image.targets: list (e.g., ['local','runtime']).
     """
+    cfg = _load_config_dict(app_root)
+    if cfg is not None:
+        targets = _cfg_get(cfg, "image", "targets")
+        if not isinstance(targets, list):
+            return []
+        return [t.strip() for t in targets if isinstance(t, str) and t.strip()]
+
     text = _read_text_config(app_root)
     img_blk = _extract_block(text, "image")
-    m = re.search(r"(?ms)^\s*targets\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", img_blk)
-    blk = m.group("blk") if m else ""
-    items: List[str] = []
-    for line in (blk.splitlines() if blk else []):
-        m2 = re.match(r"^[ \t]*-\s*([A-Za-z0-9_.-]+)\s*$", line)
-        if m2:
-            items.append(m2.group(1).strip())
-    return items
+    blk = _extract_block(img_blk, "targets")
+    return [m2.group(1) for m2 in _RE_TARGET_ITEM.finditer(blk)]
 
 def _compose_image_ref(name: str, version: str, ecr: str) -> str:
     return f"{ecr.rstrip('/')}/{name}:{version}"
 
+@lru_cache(maxsize=32)
+def _parse_ecr_image_ref_cached(image_ref: str) -> Optional[Dict[str, str]]:
+    from .aws import parse_ecr_image_ref
+    return parse_ecr_image_ref(image_ref)
+
+def _ecr_ref_parts(image_ref: str) -> Optional[Dict[str, str]]:
+    parts = _parse_ecr_image_ref_cached(image_ref)
+    return dict(parts) if parts else None
+
+def _ecr_login_once(host: str, region: str) -> int:
+    """
+    `docker login` to a registry at most once per process.
+    """
+    if (host, region) in _ECR_LOGGED_IN:
+        return 0
+    from .aws import ecr_login
+    rc = ecr_login(host, region)
+    if rc == 0:
+        _ECR_LOGGED_IN.add((host, region))
+    return rc
+
+def _buildx_plugin_installed() -> bool:
+    """
+    Path-only check for the docker-buildx CLI plugin (user and system plugin
+    dirs), so the common case needs no `docker buildx version` spawn.
+    """
+    exe = "docker-buildx.exe" if os.name == "nt" else "docker-buildx"
+    docker_cfg = os.getenv("DOCKER_CONFIG") or str(Path.home() / ".docker")
+    dirs = [
+        Path(docker_cfg) / "cli-plugins",
+        Path("/usr/local/lib/docker/cli-plugins"),
+        Path("/usr/local/libexec/docker/cli-plugins"),
+        Path("/usr/lib/docker/cli-plugins"),
+        Path("/usr/libexec/docker/cli-plugins"),
+    ]
+    return any((d / exe).is_file() for d in dirs)
+
 def _ensure_docker_buildx_available() -> bool:
-    if shutil.which("docker") is None:
+    global _BUILDX_OK
+    if _which("docker") is None:
         console.error("docker is not installed or not on PATH.")
         return False
-    try:
-        subprocess.run(["docker", "buildx", "version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-        return True
-    except Exception:
+    if _BUILDX_OK is None and _buildx_plugin_installed():
+        _BUILDX_OK = True
+    if _BUILDX_OK is None:
+        try:
+            subprocess.run(["docker", "buildx", "version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            _BUILDX_OK = True
+        except Exception:
+            _BUILDX_OK = False
+    if not _BUILDX_OK:
         console.error("docker buildx not available. Install Buildx or update Docker Desktop/Engine.")
-        return False
+    return _BUILDX_OK
 
 def _select_target_for_db(app_root: Path) -> Optional[str]:
     targets = _read_targets_list(app_root)
@@ -191,35 +388,33 @@ def _db_build_platforms() -> str:
       - PLSR_PLATFORMS
       - DOCKER_PLATFORMS
     """
-    val = (
-        os.getenv("PLSR_DB_PLATFORMS")
-        or os.getenv("PLSR_PLATFORMS")
-        or os.getenv("DOCKER_PLATFORMS")
-    )
+    val = _first_env("PLSR_DB_PLATFORMS", "PLSR_PLATFORMS", "DOCKER_PLATFORMS")
     return (val or "linux/amd64,linux/arm64").strip()
 
 
 def _sanitize_name(n: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9_.-]+", "-", n)[:63] or "plsr-service"
-
-def _container_exists(name: str) -> bool:
-    res = subprocess.run(
-        ["docker", "inspect", name],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        text=True,
-    )
-    return res.returncode == 0
+    if n.isascii() and not n.translate(_NAME_SAFE_DELETE):
+        return n[:63] or "plsr-service"
+    return _RE_SANITIZE.sub("-", n)[:63] or "plsr-service"
 
-def _container_running(name: str) -> bool:
+def _inspect_state(name: str) -> tuple[bool, bool]:
+    """
+    Return (exists, running) for a container using a single `docker inspect`.
+    """
     res = subprocess.run(
         ["docker", "inspect", "-f", "{{.State.Running}}", name],
         capture_output=True,
-        text=True,
     )
     if res.returncode != 0:
-        return False
-    return (res.stdout or "").strip().lower() == "true"
+        return False, False
+    # Go templates render booleans as lowercase `true`/`false`; compare raw bytes.
+    return True, res.stdout.startswith(b"true")
+
+def _container_exists(name: str) -> bool:
+    return _inspect_state(name)[0]
+
+def _container_running(name: str) -> bool:
+    return _inspect_state(name)[1]
 
 def _stop_local_container_and_delete_data_if_exists(app_root: Path, cname: str) -> int:
     """
@@ -230,27 +425,29 @@ def _stop_local_container_and_delete_data_if_exists(app_root: Path, cname: str)
     so we can reuse the same logic without importing run_local (avoids circular imports).
     If PLSR_ENV is not set, default to 'local'.
     """
-    if shutil.which("docker") is None:
+    if _which("docker") is None:
         return 0
-    if not _container_exists(cname):
+    exists, _running = _inspect_state(cname)
+    if not exists:
         return 0
 
     env_name = os.getenv("PLSR_ENV") or "local"
 
     console.info(f"Stopping & cleaning local DB container before rebuild: {cname} (env: {env_name})")
     cmd = [sys.executable, "-m", "plsr.bootstrap", "docker", "stop", env_name, "--name", cname]
-    env = os.environ.copy()
-    env["APP_ROOT"] = str(app_root)
-    env["PLSR_ENV"] = env_name
+    env = {**os.environ, "APP_ROOT": str(app_root), "PLSR_ENV": env_name}
     return console.run(cmd, cwd=str(app_root), env=env)
 
 def _read_dev_compose_container_name(app_root: Path) -> Optional[str]:
+    cfg = _load_config_dict(app_root)
+    if cfg is not None:
+        return _cfg_str(cfg, "dev", "compose", "container_name")
+
     text = _read_text_config(app_root)
     dev_blk = _extract_block(text, "dev")
     if not dev_blk:
         return None
-    m = re.search(r"(?ms)^\s*compose\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", dev_blk)
-    comp_blk = m.group("blk") if m else ""
+    comp_blk = _extract_block(dev_blk, "compose")
     cname = _kv_from_block(comp_blk, "container_name")
     return cname.strip() if cname else None
 
@@ -273,17 +470,24 @@ def _buildx_build_and_maybe_push(
     if not _ensure_docker_buildx_available():
         return 3
 
+    from .aws import preflight_aws_and_ecr
+
     ecr_root = image_ref.split("/", 1)[0] if "/" in image_ref else None
-    rc = preflight_aws_and_ecr(
-        app_root=app_root,
-        dockerfile=dockerfile,
-        build_args=[f"{k}={v}" for k, v in (build_args_map or {}).items()],
-        dest_ecr=ecr_root,
-        need_push=bool(push),
-        pre_pull=bool(pre_pull),
-    )
-    if rc != 0:
-        return rc
+    key = (str(app_root), str(dockerfile or ""), ecr_root, bool(push), bool(pre_pull))
+    ok_at = _PREFLIGHT_CACHE.get(key)
+    if ok_at is None or time.monotonic() - ok_at >= _PREFLIGHT_TTL_S:
+        rc = preflight_aws_and_ecr(
+            app_root=app_root,
+            dockerfile=dockerfile,
+            build_args=[f"{k}={v}" for k, v in (build_args_map or {}).items()],
+            dest_ecr=ecr_root,
+            need_push=bool(push),
+            pre_pull=bool(pre_pull),
+        )
+        if rc != 0:
+            _PREFLIGHT_CACHE.pop(key, None)
+            return rc
+        _PREFLIGHT_CACHE[key] = time.monotonic()
 
     cmd: List[str] = ["docker", "buildx", "build", "--platform", platform, "-t", image_ref]
     if dockerfile:
@@ -306,7 +510,12 @@ def _buildx_build_and_maybe_push(
         console.info(f"Target: {target}")
     return console.run(cmd, cwd=str(app_root))
 
-def ensure_db_image_in_ecr(mode: str = "build") -> Tuple[str, int]:
+def ensure_db_image_in_ecr(
+    mode: str = "build",
+    *,
+    app_root: Optional[Path] = None,
+    fields: Optional[tuple[str | None, str | None, str | None, str]] = None,
+) -> Tuple[str, int]:
     """
     Ensure the DB microservice image exists (and optionally rebuild) in ECR.
 
@@ -318,10 +527,21 @@ def ensure_db_image_in_ecr(mode: str = "build") -> Tuple[str, int]:
           • Build (multi-arch by default) and push.
       - If prompt answer is 'no' → skip build and return success.
 
+    `app_root`/`fields` (as returned by _read_fields_from_config_yaml) may be
+    passed by callers that already resolved them, skipping a second lookup.
+
     Returns: (image_ref, exit_code)
     """
-    app_root = _find_app_root_for_config()
-    name, ver, ecr, flavor = _read_fields_from_config_yaml(app_root)
+    from .aws import (
+        ecr_image_exists,
+        ecr_ensure_repo,
+        ecr_delete_image_by_tag,
+    )
+
+    if app_root is None:
+        app_root = _find_app_root_for_config()
+        fields = None
+    name, ver, ecr, flavor = fields or _read_fields_from_config_yaml(app_root)
 
     if not name or not ver:
         console.error("config.yaml must contain top-level 'name' and 'version'.")
@@ -337,7 +557,7 @@ def ensure_db_image_in_ecr(mode: str = "build") -> Tuple[str, int]:
     cname_db  = _db_default_container_name(app_root, name)
     cname_env = _sanitize_name(f"{name}-{env_name}")
 
-    parts = parse_ecr_image_ref(image_ref)
+    parts = _ecr_ref_parts(image_ref)
     if not parts or not parts.get("private"):
         console.warn("Non-private ECR detected or unable to parse ECR host; skipping ECR enforcement.")
         return image_ref, 0
@@ -348,7 +568,7 @@ def ensure_db_image_in_ecr(mode: str = "build") -> Tuple[str, int]:
     repo   = parts["repository"]
     tag    = parts["tag"]
 
-    rc = ecr_login(host, region)
+    rc = _ecr_login_once(host, region)
     if rc != 0:
         return image_ref, rc
 
@@ -420,8 +640,8 @@ def docker_build_from_config(
     push: bool = False,
     target: str | None = None,
     no_cache: bool = False,
-    build_args: List[str] | None = None,
-    labels: List[str] | None = None,
+    build_args: Iterable[str] | None = None,
+    labels: Iterable[str] | None = None,
     preflight: bool = True,
     pre_pull: bool = True,
 ) -> int:
@@ -431,14 +651,15 @@ def docker_build_from_config(
     like the previous implementation.
     """
     app_root = _find_app_root_for_config()
-    name, ver, ecr, flavor = _read_fields_from_config_yaml(app_root)
+    fields = _read_fields_from_config_yaml(app_root)
+    name, ver, ecr, flavor = fields
     if not name or not ver:
         console.error("Missing required fields in config.yaml. Need top-level keys 'name' and 'version'.")
         console.tip(f"Searched: {app_root / 'config.yaml'}")
         return 2
 
     if flavor == "db-mariadb":
-        _, rc = ensure_db_image_in_ecr(mode="build")
+        _, rc = ensure_db_image_in_ecr(mode="build", app_root=app_root, fields=fields)
         return rc
 
     if not ecr:
@@ -3,16 +3,53 @@ import os
 import shutil
 import subprocess
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
-from plsr import k8s, app as app_module
 from plsr.console import console
-from plsr import run_local
-from plsr import run_host
-from plsr.build import docker_build_from_config, print_image_tag_from_config
-from plsr import db_migrate
-from plsr import helm_release
+
+# Command modules (k8s, app, run_local, run_host, build, db_migrate, helm_release)
+# are imported inside the branch that needs them to keep small commands fast.
+
+if sys.version_info >= (3, 14):
+    class _HelpFormatter(argparse.HelpFormatter):
+        """
+        3.14's formatter probes the terminal/env for colour support on every
+        instantiation (several per add_argument); always take the no-colour path.
+        """
+        def _set_color(self, color, *args, **kwargs):
+            super()._set_color(False, *args, **kwargs)
+else:
+    _HelpFormatter = argparse.HelpFormatter
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    # add_subparsers() reuses the parent's class, so every subparser gets the formatter too.
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("formatter_class", _HelpFormatter)
+        super().__init__(*args, **kwargs)
+
+
+_DEV_FLAGS = frozenset({"-dev", "--dev"})
+_KNOWN_TOP = frozenset({"hello", "update-lib", "k8s", "app", "docker", "build", "start", "run", "stop", "db", "helm"})
+
+_DEV_CACHE: bool | None = None
+
+
+def _is_dev() -> bool:
+    """
+    plsr_DEV lookup, read from the environment once per process.
+    """
+    global _DEV_CACHE
+    if _DEV_CACHE is None:
+        _DEV_CACHE = bool(os.getenv("plsr_DEV"))
+    return _DEV_CACHE
+
+
+@lru_cache(maxsize=4)
+def _which(cmd: str) -> str | None:
+    return shutil.which(cmd)
 
 
 def _print_help_and_exit(parser):
@@ -28,19 +65,18 @@ def _consume_global_flags(argv: List[str]) -> Tuple[bool, str | None, List[str]]
     dev = False
     theme = None
     out: List[str] = []
-    i = 0
-    while i < len(argv):
-        a = argv[i]
-        if a in ("-dev", "--dev"):
+    last = len(argv) - 1
+    skip = False
+    for i, a in enumerate(argv):
+        if skip:
+            skip = False
+        elif a in _DEV_FLAGS:
             dev = True
-            i += 1
-            continue
-        if a == "--theme" and i + 1 < len(argv):
+        elif a == "--theme" and i < last:
             theme = argv[i + 1]
-            i += 2
-            continue
-        out.append(a)
-        i += 1
+            skip = True
+        else:
+            out.append(a)
     return dev, theme, out
 
 
@@ -48,15 +84,17 @@ def _require_env_hint(cmd_stub: str) -> int:
     """
     Print a consistent, user-friendly hint when ENV is missing.
     """
-    console.error("Environment name is required.")
-    console.tip(f"Use: plsr {cmd_stub} <env>")
-    console.info("Examples:")
-    console.info(f"  ./ctl.sh {cmd_stub} local")
-    console.info(f"  plsr {cmd_stub} dev")
+    console.lines(
+        ("error", "Environment name is required."),
+        ("tip", f"Use: plsr {cmd_stub} <env>"),
+        ("info", "Examples:"),
+        ("info", f"  ./ctl.sh {cmd_stub} local"),
+        ("info", f"  plsr {cmd_stub} dev"),
+    )
     return 2
 
 def update_lib(dev_mode: bool):
-    if dev_mode or os.getenv("plsr_DEV"):
+    if dev_mode or _is_dev():
         console.info("DEV mode detected (plsr_DEV=1). Skipping update.")
         return 0
 
@@ -64,165 +102,413 @@ def update_lib(dev_mode: bool):
     if not (repo_root / ".git").is_dir():
         console.warn(f"Not a git repository at {repo_root}; cannot update.")
         return 1
-    if shutil.which("git") is None:
+    if _which("git") is None:
         console.error("git not found; cannot update.")
         return 1
 
     try:
         res = subprocess.run(
             ["git", "-C", str(repo_root), "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True, text=True, check=True
+            capture_output=True, check=True
         )
-        current_branch = res.stdout.strip()
+        current_branch = res.stdout.strip().decode("ascii", "replace") or None
     except subprocess.CalledProcessError:
         current_branch = None
 
     target_branch = os.getenv("plsr_BRANCH") or current_branch or "main"
     console.info(f"Updating plsr at {repo_root} (branch: {target_branch})")
-    try:
-        code = 0
-        code |= console.run(["git", "-C", str(repo_root), "fetch", "--depth", "1", "origin", target_branch])
-        if code != 0:
-            return 1
-        code |= console.run(["git", "-C", str(repo_root), "checkout", target_branch])
+    # git writes straight to the terminal; stop at the first failing step.
+    steps = (
+        ["git", "-C", str(repo_root), "fetch", "--depth", "1", "origin", target_branch],
+        # checkout -f -B == checkout + reset --hard onto the fetched tip, in one spawn
+        ["git", "-C", str(repo_root), "checkout", "-f", "-B", target_branch, f"origin/{target_branch}"],
+    )
+    for cmd in steps:
+        console.command(cmd)
+        code = subprocess.run(cmd, check=False).returncode
         if code != 0:
+            console.error(f"Update failed: {cmd[3]} exited with code {code}")
             return 1
-        code |= console.run(["git", "-C", str(repo_root), "reset", "--hard", f"origin/{target_branch}"])
-        return 0 if code == 0 else 1
-    except subprocess.CalledProcessError as e:
-        console.error(f"Update failed: {e}")
-        return 1
-
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(
+    console.success("plsr updated")
+    return 0
+
+# Parser layout as data: (flags, add_argument kwargs) per option, and
+# (name, help, options) per subcommand. build_parser() just walks these tables.
+_ArgSpec = Tuple[Tuple[str, ...], dict]
+
+_ENV_REQUIRED: _ArgSpec = (("env",), {"help": "Environment name (positional, required)"})
+_HOST_DRY_RUN: _ArgSpec = (("--dry-run",), {"action": "store_true", "help": "Preview host runtime actions"})
+
+_GLOBAL_ARGS: List[_ArgSpec] = [
+    (("-dev", "--dev"), {"action": "store_true", "help": "Development mode (skip self-update)"}),
+    (("--theme",), {"choices": ["current", "neon", "retro"], "help": "Choose console output theme"}),
+]
+
+_DOCKER_BUILD_ARGS: List[_ArgSpec] = [
+    _ENV_REQUIRED,
+    (("--context",), {"default": ".", "help": "Build context (default: .)"}),
+    (("-f", "--dockerfile"), {"default": None, "help": "Path to Dockerfile"}),
+    (("--platform",), {"default": "linux/amd64", "help": "Target platform"}),
+    (("--push",), {"action": "store_true", "help": "Push image to registry (non-DB only)"}),
+    (("--target",), {"default": None, "help": "Multi-stage target"}),
+    (("--no-cache",), {"action": "store_true", "help": "Disable build cache"}),
+    (("--build-arg",), {"action": "append", "default": [], "help": "--build-arg KEY=VALUE"}),
+    (("--label",), {"action": "append", "default": [], "help": "--label KEY=VALUE"}),
+    (("--no-preflight",), {"action": "store_true", "help": "Skip AWS/ECR preflight"}),
+    (("--no-prepull",), {"action": "store_true", "help": "Skip pre-pulling private ECR bases"}),
+]
+
+_DOCKER_RUN_ARGS: List[_ArgSpec] = [
+    _ENV_REQUIRED,
+    (("--image",), {"default": None, "help": "Override image to run"}),
+    (("--name",), {"default": None, "help": "Override container name"}),
+    (("-p", "--port"), {"action": "append", "default": [], "help": "Port mapping(s) HOST:CONT"}),
+    (("--env-var", "-E"), {"action": "append", "default": [], "help": "Container env KEY=VALUE"}),
+    (("--data-dir",), {"default": None, "help": "Host dir for DB persistent data"}),
+    (("--no-detach",), {"action": "store_true", "help": "Run in foreground"}),
+    (("--pull",), {"action": "store_true", "help": "Force docker pull before run"}),
+    (("--skip-aws",), {"action": "store_true", "help": "Skip AWS/ECR login when pulling image"}),
+    (("--dry-run",), {"action": "store_true", "help": "Print docker run command without executing"}),
+]
+
+_DOCKER_STOP_ARGS: List[_ArgSpec] = [
+    _ENV_REQUIRED,
+    (("--name",), {"default": None, "help": "Override container name"}),
+    (("--keep-data",), {"action": "store_true", "help": "Keep DB data dir (default: delete)"}),
+    (("--dry-run",), {"action": "store_true", "help": "Print actions without executing"}),
+]
+
+_K8S_CMDS = [
+    ("setup", "Install ingress + cert-manager + ClusterIssuer", []),
+    ("install", "Alias for 'setup'", []),
+    ("install-ingress", "Install only NGINX Ingress", []),
+    ("ingress", "Alias for 'install-ingress'", []),
+    ("cluster-issuer", "Apply ClusterIssuer.yaml", []),
+    ("issuer", "Alias for 'cluster-issuer'", []),
+]
+
+_APP_CMDS = [("start", "Print detected app name and version", [])]
+
+_DOCKER_CMDS = [
+    ("build", "Build image using config.yaml (buildx)", _DOCKER_BUILD_ARGS),
+    ("print-tag", "Print computed image tag from config.yaml", []),
+    ("run", "Run the microservice as a Docker container", _DOCKER_RUN_ARGS),
+    ("stop", "Stop/remove the microservice Docker container", _DOCKER_STOP_ARGS),
+]
+
+_DB_CMDS = [("migrate", "Apply db/*.sql migrations", [_ENV_REQUIRED])]
+
+_HELM_CMDS = [("release", "Release/upgrade the service into an env namespace", [_ENV_REQUIRED])]
+
+# (name, help, options, (group dest, group subcommands) or None)
+_TOP_CMDS = [
+    ("hello", "Print 'hello world'", [], None),
+    ("update-lib", "Update plsr library (skips in -dev)", [], None),
+    ("k8s", "Kubernetes helper commands", [], ("k8s_cmd", _K8S_CMDS)),
+    ("app", "App lifecycle commands", [], ("app_cmd", _APP_CMDS)),
+    ("docker", "Docker helpers", [], ("docker_cmd", _DOCKER_CMDS)),
+    ("run", "Run the service directly on the host (no Docker)", [_ENV_REQUIRED, _HOST_DRY_RUN], None),
+    ("stop", "Stop the host (non-Docker) runtime", [_ENV_REQUIRED, _HOST_DRY_RUN], None),
+    ("build", "Alias for 'docker build'", [_ENV_REQUIRED], None),
+    ("start", "Start the service on the host (no Docker)",
+     [(("env",), {"nargs": "?", "default": None, "help": "Environment name (default: local)"})], None),
+    ("db", "Database helpers (schema migrations)", [], ("db_cmd", _DB_CMDS)),
+    ("helm", "Helm-based deploys via the central plsr chart", [], ("helm_cmd", _HELM_CMDS)),
+]
+
+
+def _add_args(parser: argparse.ArgumentParser, specs: List[_ArgSpec]) -> None:
+    for flags, kwargs in specs:
+        parser.add_argument(*flags, **kwargs)
+
+
+def _add_commands(parser: argparse.ArgumentParser, dest: str, cmds) -> Dict[str, argparse.ArgumentParser]:
+    sub = parser.add_subparsers(dest=dest)
+    parsers: Dict[str, argparse.ArgumentParser] = {}
+    for name, help_text, specs, *group in cmds:
+        p = parsers[name] = sub.add_parser(name, help=help_text)
+        _add_args(p, specs)
+        if group and group[0]:
+            _add_commands(p, *group[0])
+    return parsers
+
+
+@lru_cache(maxsize=1)
+def build_parser() -> Tuple[argparse.ArgumentParser, Dict[str, argparse.ArgumentParser]]:
+    """
+    Built once per process. Returns (parser, {top-level command: its subparser})
+    so group help can be printed without re-parsing.
+    """
+    parser = _ArgumentParser(
         prog="plsr",
         description="plsr CLI – central orchestrator for microservices (local dev workflows)"
     )
-    parser.add_argument("-dev", "--dev", action="store_true", help="Development mode (skip self-update)")
-    parser.add_argument("--theme", choices=["current", "neon", "retro"], help="Choose console output theme")
-
-    subparsers = parser.add_subparsers(dest="command")
-
-    subparsers.add_parser("hello", help="Print 'hello world'")
-
-    subparsers.add_parser("update-lib", help="Update plsr library (skips in -dev)")
-
-    k8s_parser = subparsers.add_parser("k8s", help="Kubernetes helper commands")
-    k8s_sub = k8s_parser.add_subparsers(dest="k8s_cmd")
-    k8s_sub.add_parser("setup", help="Install ingress + cert-manager + ClusterIssuer")
-    k8s_sub.add_parser("install", help="Alias for 'setup'")
-    k8s_sub.add_parser("install-ingress", help="Install only NGINX Ingress")
-    k8s_sub.add_parser("ingress", help="Alias for 'install-ingress'")
-    k8s_sub.add_parser("cluster-issuer", help="Apply ClusterIssuer.yaml")
-    k8s_sub.add_parser("issuer", help="Alias for 'cluster-issuer'")
-
-    app_parser = subparsers.add_parser("app", help="App lifecycle commands")
-    app_sub = app_parser.add_subparsers(dest="app_cmd")
-    app_sub.add_parser("start", help="Print detected app name and version")
-
-    docker_parser = subparsers.add_parser("docker", help="Docker helpers")
-    docker_sub = docker_parser.add_subparsers(dest="docker_cmd")
-
-    docker_build_p = docker_sub.add_parser("build", help="Build image using config.yaml (buildx)")
-    docker_build_p.add_argument("env", help="Environment name (positional, required)")
-    docker_build_p.add_argument("--context", default=".", help="Build context (default: .)")
-    docker_build_p.add_argument("-f", "--dockerfile", default=None, help="Path to Dockerfile")
-    docker_build_p.add_argument("--platform", default="linux/amd64", help="Target platform")
-    docker_build_p.add_argument("--push", action="store_true", help="Push image to registry (non-DB only)")
-    docker_build_p.add_argument("--target", default=None, help="Multi-stage target")
-    docker_build_p.add_argument("--no-cache", action="store_true", help="Disable build cache")
-    docker_build_p.add_argument("--build-arg", action="append", default=[], help="--build-arg KEY=VALUE")
-    docker_build_p.add_argument("--label", action="append", default=[], help="--label KEY=VALUE")
-    docker_build_p.add_argument("--no-preflight", action="store_true", help="Skip AWS/ECR preflight")
-    docker_build_p.add_argument("--no-prepull", action="store_true", help="Skip pre-pulling private ECR bases")
-
-    docker_sub.add_parser("print-tag", help="Print computed image tag from config.yaml")
-
-    docker_run_p = docker_sub.add_parser("run", help="Run the microservice as a Docker container")
-    docker_run_p.add_argument("env", help="Environment name (positional, required)")
-    docker_run_p.add_argument("--image", default=None, help="Override image to run")
-    docker_run_p.add_argument("--name", default=None, help="Override container name")
-    docker_run_p.add_argument("-p", "--port", action="append", default=[], help="Port mapping(s) HOST:CONT")
-    docker_run_p.add_argument("--env-var", "-E", action="append", default=[], help="Container env KEY=VALUE")
-    docker_run_p.add_argument("--data-dir", default=None, help="Host dir for DB persistent data")
-    docker_run_p.add_argument("--no-detach", action="store_true", help="Run in foreground")
-    docker_run_p.add_argument("--pull", action="store_true", help="Force docker pull before run")
-    docker_run_p.add_argument("--skip-aws", action="store_true", help="Skip AWS/ECR login when pulling image")
-    docker_run_p.add_argument("--dry-run", action="store_true", help="Print docker run command without executing")
-
-    docker_stop_p = docker_sub.add_parser("stop", help="Stop/remove the microservice Docker container")
-    docker_stop_p.add_argument("env", help="Environment name (positional, required)")
-    docker_stop_p.add_argument("--name", default=None, help="Override container name")
-    docker_stop_p.add_argument("--keep-data", action="store_true", help="Keep DB data dir (default: delete)")
-    docker_stop_p.add_argument("--dry-run", action="store_true", help="Print actions without executing")
-
-    host_run_p = subparsers.add_parser("run", help="Run the service directly on the host (no Docker)")
-    host_run_p.add_argument("env", help="Environment name (positional, required)")
-    host_run_p.add_argument("--dry-run", action="store_true", help="Preview host runtime actions")
-
-    host_stop_p = subparsers.add_parser("stop", help="Stop the host (non-Docker) runtime")
-    host_stop_p.add_argument("env", help="Environment name (positional, required)")
-    host_stop_p.add_argument("--dry-run", action="store_true", help="Preview host runtime actions")
-
-    build_top = subparsers.add_parser("build", help="Alias for 'docker build'")
-    build_top.add_argument("env", help="Environment name (positional, required)")
-
-    start_top = subparsers.add_parser("start", help="Start the service on the host (no Docker)")
-    start_top.add_argument("env", nargs="?", default=None, help="Environment name (default: local)")
-
-    db_parser = subparsers.add_parser("db", help="Database helpers (schema migrations)")
-    db_sub = db_parser.add_subparsers(dest="db_cmd")
-    db_migrate_p = db_sub.add_parser("migrate", help="Apply db/*.sql migrations")
-    db_migrate_p.add_argument("env", help="Environment name (positional, required)")
-
-    helm_parser = subparsers.add_parser("helm", help="Helm-based deploys via the central plsr chart")
-    helm_sub = helm_parser.add_subparsers(dest="helm_cmd")
-    helm_release_p = helm_sub.add_parser("release", help="Release/upgrade the service into an env namespace")
-    helm_release_p.add_argument("env", help="Environment name (positional, required)")
-
-    return parser
+    _add_args(parser, _GLOBAL_ARGS)
+    return parser, _add_commands(parser, "command", _TOP_CMDS)
 
+@lru_cache(maxsize=8)
 def _env_run_parser(env_name: str) -> argparse.ArgumentParser:
-    p = argparse.ArgumentParser(
+    p = _ArgumentParser(
         prog=f"plsr {env_name} run",
         description=f"Run the service on host for environment '{env_name}' (no Docker)"
     )
     p.add_argument("--dry-run", action="store_true", help="Preview host runtime actions")
     return p
 
+@lru_cache(maxsize=8)
 def _env_stop_parser(env_name: str) -> argparse.ArgumentParser:
-    p = argparse.ArgumentParser(
+    p = _ArgumentParser(
         prog=f"plsr {env_name} stop",
         description=f"Stop the host runtime for environment '{env_name}' (no Docker)"
     )
     p.add_argument("--dry-run", action="store_true", help="Preview host runtime actions")
     return p
 
-def _env_db_parser(env_name: str) -> argparse.ArgumentParser:
-    p = argparse.ArgumentParser(
-        prog=f"plsr {env_name} db migrate",
-        description=f"Apply db/*.sql migrations for environment '{env_name}'"
-    )
-    return p
-
 def _env_helm_parser(env_name: str) -> argparse.ArgumentParser:
-    p = argparse.ArgumentParser(
+    # Only built for `plsr <env> helm release -h`; the release itself takes no flags.
+    return _ArgumentParser(
         prog=f"plsr {env_name} helm release",
         description=f"Release/upgrade the service into Kubernetes for environment '{env_name}'"
     )
-    return p
+
+def _cmd_hello(args, dev_mode: bool) -> int:
+    print("hello world")
+    return 0
+
+def _cmd_update_lib(args, dev_mode: bool) -> int:
+    return update_lib(dev_mode)
+
+def _k8s_setup(args) -> int:
+    from plsr import k8s
+    k8s.setup()
+    return 0
+
+def _k8s_install_ingress(args) -> int:
+    from plsr import k8s
+    k8s.install_ingress()
+    return 0
+
+def _k8s_cluster_issuer(args) -> int:
+    from plsr import k8s
+    k8s.apply_clusterissuer()
+    return 0
+
+def _app_start(args) -> int:
+    from plsr import app as app_module
+    app_module.start()
+    return 0
+
+def _docker_build(args) -> int:
+    from plsr.build import docker_build_from_config
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("docker build")
+    os.environ["plsr_ENV"] = env_name
+    return docker_build_from_config(
+        context=args.context,
+        dockerfile=args.dockerfile,
+        platform=args.platform,
+        push=args.push,
+        target=args.target,
+        no_cache=args.no_cache,
+        build_args=args.build_arg,
+        labels=args.label,
+        preflight=not args.no_preflight,
+        pre_pull=not args.no_prepull,
+    )
+
+def _docker_print_tag(args) -> int:
+    from plsr.build import print_image_tag_from_config
+    return print_image_tag_from_config()
+
+def _docker_run(args) -> int:
+    from plsr import run_local
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("docker run")
+    return run_local.auto_run(
+        env_name=env_name,
+        image_override=args.image,
+        name_override=args.name,
+        port_overrides=args.port,
+        env_overrides=args.env_var,
+        data_host_dir=args.data_dir,
+        detach=not args.no_detach,
+        force_pull=args.pull,
+        skip_aws=args.skip_aws,
+        dry_run=args.dry_run,
+    )
+
+def _docker_stop(args) -> int:
+    from plsr import run_local
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("docker stop")
+    return run_local.auto_stop(
+        env_name=env_name,
+        name_override=args.name,
+        keep_data=args.keep_data,
+        dry_run=args.dry_run,
+    )
+
+def _db_migrate(args) -> int:
+    from plsr import db_migrate
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("db migrate")
+    return db_migrate.migrate(env_name=env_name)
+
+def _helm_release(args) -> int:
+    from plsr import helm_release
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("helm release")
+    return helm_release.release(env_name=env_name)
+
+def _group(args, dest: str, table: dict, subparsers: Dict[str, argparse.ArgumentParser]) -> int:
+    """
+    Run a command group: dispatch on args.<dest>, else print the group help
+    from the already-built subparser map.
+    """
+    sub = table.get(getattr(args, dest))
+    if sub is not None:
+        return sub(args)
+    subparsers[args.command].print_help(sys.stdout)
+    return 0
+
+def _cmd_run(args, dev_mode: bool) -> int:
+    from plsr import run_host
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("run")
+    return run_host.auto_run(env_name=env_name, dry_run=args.dry_run)
+
+def _cmd_stop(args, dev_mode: bool) -> int:
+    from plsr import run_host
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("stop")
+    return run_host.auto_stop(env_name=env_name, dry_run=args.dry_run)
+
+def _cmd_build(args, dev_mode: bool) -> int:
+    from plsr.build import docker_build_from_config
+    env_name = args.env
+    if not env_name:
+        return _require_env_hint("build")
+    os.environ["plsr_ENV"] = env_name
+    return docker_build_from_config()
+
+def _cmd_start(args, dev_mode: bool) -> int:
+    from plsr import app as app_module, run_host
+    env_name = args.env or os.getenv("plsr_ENV") or "local"
+    os.environ["plsr_ENV"] = env_name
+    ctx = app_module.start(env_name=env_name)
+    return run_host.auto_run(env_name=env_name, ctx=ctx)
+
+_TOP_DISPATCH = {
+    "hello": _cmd_hello,
+    "update-lib": _cmd_update_lib,
+    "run": _cmd_run,
+    "stop": _cmd_stop,
+    "build": _cmd_build,
+    "start": _cmd_start,
+}
+
+# command -> (args attribute naming the subcommand, subcommand handlers)
+_GROUP_DISPATCH = {
+    "k8s": ("k8s_cmd", {
+        None: _k8s_setup,
+        "setup": _k8s_setup,
+        "install": _k8s_setup,
+        "install-ingress": _k8s_install_ingress,
+        "ingress": _k8s_install_ingress,
+        "cluster-issuer": _k8s_cluster_issuer,
+        "issuer": _k8s_cluster_issuer,
+    }),
+    "app": ("app_cmd", {None: _app_start, "start": _app_start}),
+    "docker": ("docker_cmd", {
+        "build": _docker_build,
+        "print-tag": _docker_print_tag,
+        "run": _docker_run,
+        "stop": _docker_stop,
+    }),
+    "db": ("db_cmd", {"migrate": _db_migrate}),
+    "helm": ("helm_cmd", {"release": _helm_release}),
+}
+
+def _env_run(env: str, rest: List[str]) -> int:
+    from plsr import run_host
+    a, _unknown = _env_run_parser(env).parse_known_args(rest)
+    return run_host.auto_run(env_name=env, dry_run=a.dry_run)
+
+def _env_stop(env: str, rest: List[str]) -> int:
+    from plsr import run_host
+    a, _unknown = _env_stop_parser(env).parse_known_args(rest)
+    return run_host.auto_stop(env_name=env, dry_run=a.dry_run)
+
+def _env_start(env: str, rest: List[str]) -> int:
+    from plsr import app as app_module, run_host
+    ctx = app_module.start(env_name=env)
+    return run_host.auto_run(env_name=env, ctx=ctx)
+
+def _env_db(env: str, rest: List[str]) -> int:
+    if not rest:
+        console.error("Missing db action. Use: migrate")
+        return 2
+    action = rest[0]
+    if action == "migrate":
+        from plsr import db_migrate
+        return db_migrate.migrate(env_name=env)
+    console.error(f"Unknown db action '{action}'. Supported: migrate")
+    return 2
+
+def _env_helm(env: str, rest: List[str]) -> int:
+    if not rest:
+        console.error("Missing helm action. Use: release")
+        return 2
+    action = rest[0]
+    if action == "release":
+        if "-h" in rest or "--help" in rest:
+            _env_helm_parser(env).print_help(sys.stdout)
+            return 0
+        from plsr import helm_release
+        return helm_release.release(env_name=env)
+    console.error(f"Unknown helm action '{action}'. Supported: release")
+    return 2
+
+_ENV_SUB_DISPATCH = {
+    "run": _env_run,
+    "stop": _env_stop,
+    "start": _env_start,
+    "db": _env_db,
+    "helm": _env_helm,
+}
 
 def run_from_args(argv=None) -> int:
     argv = list(argv or sys.argv[1:])
 
+    global _DEV_CACHE
     dev_mode, theme, argv = _consume_global_flags(argv)
-    if dev_mode:
-        os.environ["plsr_DEV"] = "1"
+    # Collected and exported with one os.environ.update() before any handler runs.
+    env_updates: dict[str, str] = {}
+    if dev_mode and not _is_dev():
+        env_updates["plsr_DEV"] = "1"
+        _DEV_CACHE = True
     if theme:
         console.set_theme(theme)
-
-    KNOWN_TOP = {"hello", "update-lib", "k8s", "app", "docker", "build", "start", "run", "stop", "db", "helm"}
-    if argv and argv[0] not in KNOWN_TOP:
+    # Intern the command words so the frozenset/dict lookups below (keyed by
+    # interned literals) resolve on identity. `is` comparisons would still be
+    # wrong here: argparse hands back the argv string itself, not the literal.
+    argv[:2] = map(sys.intern, argv[:2])
+
+    # Argument-less commands skip argparse entirely.
+    if argv == ["hello"]:
+        return _cmd_hello(None, dev_mode)
+    if argv == ["update-lib"]:
+        os.environ.update(env_updates)
+        return _cmd_update_lib(None, dev_mode)
+
+    if argv and argv[0] not in _KNOWN_TOP:
         env = argv[0]
         if len(argv) == 1:
             console.error("Missing subcommand. Usage: plsr <env> (run|stop|start|db migrate|helm release) [options]")
@@ -230,161 +516,30 @@ def run_from_args(argv=None) -> int:
         sub = argv[1]
         rest = argv[2:]
 
-        os.environ["plsr_ENV"] = env
-
-        if sub == "run":
-            parser = _env_run_parser(env)
-            a, _unknown = parser.parse_known_args(rest)
-            return run_host.auto_run(env_name=env, dry_run=bool(a.dry_run))
-
-        if sub == "stop":
-            parser = _env_stop_parser(env)
-            a, _unknown = parser.parse_known_args(rest)
-            return run_host.auto_stop(env_name=env, dry_run=bool(a.dry_run))
-
-        if sub == "start":
-            app_module.start(env_name=env)
-            return run_host.auto_run(env_name=env)
-
-        if sub == "db":
-            if not rest:
-                console.error("Missing db action. Use: migrate")
-                return 2
-            action = rest[0]
-            if action == "migrate":
-                return db_migrate.migrate(env_name=env)
-            console.error(f"Unknown db action '{action}'. Supported: migrate")
-            return 2
+        if os.environ.get("plsr_ENV") != env:
+            env_updates["plsr_ENV"] = env
+        os.environ.update(env_updates)
 
-        if sub == "helm":
-            if not rest:
-                console.error("Missing helm action. Use: release")
-                return 2
-            action = rest[0]
-            if action == "release":
-                _env_helm_parser(env).parse_known_args(rest[1:])
-                return helm_release.release(env_name=env)
-            console.error(f"Unknown helm action '{action}'. Supported: release")
-            return 2
+        handler = _ENV_SUB_DISPATCH.get(sub)
+        if handler is not None:
+            return handler(env, rest)
 
         console.error(f"Unknown microservice subcommand '{sub}'. Use: run | stop | start | db migrate | helm release")
         return 2
 
-    parser = build_parser()
+    os.environ.update(env_updates)
+    parser, subparsers = build_parser()
     args = parser.parse_args(argv)
 
     if args.command is None:
         _print_help_and_exit(parser)
 
-    if args.command == "hello":
-        print("hello world")
-        return 0
-
-    if args.command == "update-lib":
-        return update_lib(dev_mode)
-
-    if args.command == "k8s":
-        if args.k8s_cmd in (None, "setup", "install"):
-            k8s.setup(); return 0
-        if args.k8s_cmd in ("install-ingress", "ingress"):
-            k8s.install_ingress(); return 0
-        if args.k8s_cmd in ("cluster-issuer", "issuer"):
-            k8s.apply_clusterissuer(); return 0
-        build_parser().parse_args(["k8s", "-h"]); return 1
-
-    if args.command == "app":
-        if args.app_cmd in (None, "start"):
-            app_module.start(); return 0
-        build_parser().parse_args(["app", "-h"]); return 1
-
-    if args.command == "docker":
-        if args.docker_cmd == "build":
-            env_name = args.env
-            if not env_name:
-                return _require_env_hint("docker build")
-            os.environ["plsr_ENV"] = env_name
-            return docker_build_from_config(
-                context=args.context,
-                dockerfile=args.dockerfile,
-                platform=args.platform,
-                push=bool(args.push),
-                target=args.target,
-                no_cache=bool(args.no_cache),
-                build_args=list(args.build_arg or []),
-                labels=list(args.label or []),
-                preflight=True if not args.no_preflight else False,
-                pre_pull=True if not args.no_prepull else False,
-            )
-        if args.docker_cmd == "print-tag":
-            return print_image_tag_from_config()
-        if args.docker_cmd == "run":
-            env_name = args.env
-            if not env_name:
-                return _require_env_hint("docker run")
-            return run_local.auto_run(
-                env_name=env_name,
-                image_override=args.image,
-                name_override=args.name,
-                port_overrides=list(args.port or []),
-                env_overrides=list(args.env_var or []),
-                data_host_dir=args.data_dir,
-                detach=not bool(args.no_detach),
-                force_pull=bool(args.pull),
-                skip_aws=bool(args.skip_aws),
-                dry_run=bool(args.dry_run),
-            )
-        if args.docker_cmd == "stop":
-            env_name = args.env
-            if not env_name:
-                return _require_env_hint("docker stop")
-            return run_local.auto_stop(
-                env_name=env_name,
-                name_override=args.name,
-                keep_data=bool(args.keep_data),
-                dry_run=bool(args.dry_run),
-            )
-        build_parser().parse_args(["docker", "-h"]); return 1
-
-    if args.command == "run":
-        env_name = args.env
-        if not env_name:
-            return _require_env_hint("run")
-        return run_host.auto_run(env_name=env_name, dry_run=bool(args.dry_run))
-
-    if args.command == "stop":
-        env_name = args.env
-        if not env_name:
-            return _require_env_hint("stop")
-        return run_host.auto_stop(env_name=env_name, dry_run=bool(args.dry_run))
-
-    if args.command == "build":
-        env_name = args.env
-        if not env_name:
-            return _require_env_hint("build")
-        os.environ["plsr_ENV"] = env_name
-        return docker_build_from_config()
-
-    if args.command == "start":
-        env_name = args.env or os.getenv("plsr_ENV") or "local"
-        os.environ["plsr_ENV"] = env_name
-        app_module.start(env_name=env_name)
-        return run_host.auto_run(env_name=env_name)
-
-    if args.command == "db":
-        if args.db_cmd == "migrate":
-            env_name = args.env
-            if not env_name:
-                return _require_env_hint("db migrate")
-            return db_migrate.migrate(env_name=env_name)
-        build_parser().parse_args(["db", "-h"]); return 1
-
-    if args.command == "helm":
-        if args.helm_cmd == "release":
-            env_name = args.env
-            if not env_name:
-                return _require_env_hint("helm release")
-            return helm_release.release(env_name=env_name)
-        build_parser().parse_args(["helm", "-h"]); return 1
+    handler = _TOP_DISPATCH.get(args.command)
+    if handler is not None:
+        return handler(args, dev_mode)
+    group = _GROUP_DISPATCH.get(args.command)
+    if group is not None:
+        return _group(args, *group, subparsers)
 
     _print_help_and_exit(parser)
     return 1
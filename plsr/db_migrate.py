@@ -2,15 +2,22 @@ from __future__ import annotations
 
 import os
 import re
-import shlex
 import time
 import hashlib
+import json
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
+try:
+    import yaml as _yaml
+except ImportError:
+    _yaml = None
+
 from .console import console
 
 
@@ -27,28 +34,92 @@ def _app_root() -> Path:
     return cur
 
 
+@lru_cache(maxsize=32)
+def _read_text_cached(path_str: str, mtime_ns: int) -> Optional[str]:
+    """
+    Read a text file once per (path, mtime); editing the file bumps the mtime
+    and misses the cache. None if it cannot be read (e.g. a directory).
+    """
+    try:
+        return Path(path_str).read_text(encoding="utf-8", errors="ignore")
+    except Exception:
+        return None
+
+
+def _read_text(p: Path) -> Optional[str]:
+    try:
+        st = os.stat(p)
+    except OSError:
+        return None
+    return _read_text_cached(str(p), st.st_mtime_ns)
+
+
 def _read_config_text(root: Path) -> str:
-    p = root / "config.yaml"
-    if not p.is_file():
-        return ""
+    return _read_text(root / "config.yaml") or ""
+
+
+@lru_cache(maxsize=8)
+def _load_config_dict_cached(path_str: str, mtime_ns: int) -> dict | None:
+    """
+    Parse config.yaml once per (path, mtime) with PyYAML's (C)BaseLoader, so
+    scalars stay strings like the regex readers. None when PyYAML is missing
+    or the file is not a mapping; callers then use the regex readers.
+    """
+    if _yaml is None:
+        return None
+    loader = getattr(_yaml, "CBaseLoader", None) or _yaml.BaseLoader
     try:
-        return p.read_text(encoding="utf-8", errors="ignore")
+        data = _yaml.load(_read_text_cached(path_str, mtime_ns) or "", Loader=loader)
     except Exception:
-        return ""
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _load_config_dict(root: Path) -> dict | None:
+    p = root / "config.yaml"
+    try:
+        st = os.stat(p)
+    except OSError:
+        return None
+    return _load_config_dict_cached(str(p), st.st_mtime_ns)
+
+
+def _cfg_str(cfg: dict | None, *path: str) -> Optional[str]:
+    cur = cfg
+    for key in path:
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(key)
+    if not isinstance(cur, str):
+        return None
+    return cur.strip() or None
+
+
+_RE_DOTENV_LINE = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)\s*$")
+
+
+@lru_cache(maxsize=64)
+def _block_pattern(section: str) -> re.Pattern[str]:
+    return re.compile(rf"(?ms)^\s*{re.escape(section)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)")
+
+
+@lru_cache(maxsize=64)
+def _kv_pattern(key: str) -> re.Pattern[str]:
+    return re.compile(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$")
 
 
 def _extract_block(text: str, section: str) -> str:
-    m = re.search(rf"(?ms)^\s*{re.escape(section)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", text)
+    m = _block_pattern(section).search(text)
     return m.group("blk") if m else ""
 
 
 def _kv_from_block(block: str, key: str) -> Optional[str]:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", block)
+    m = _kv_pattern(key).search(block)
     return m.group(1).strip() if m else None
 
 
 def _kv_top(text: str, key: str) -> Optional[str]:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", text)
+    m = _kv_pattern(key).search(text)
     return m.group(1).strip() if m else None
 
 
@@ -63,26 +134,23 @@ def _load_dotenv_map(root: Path, env_name: str) -> Dict[str, str]:
         root / ".env",
     ]
     out: Dict[str, str] = {}
-    rx = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)\s*$")
     for path in candidates:
-        if not path.is_file():
+        text = _read_text(path)
+        if text is None:
             continue
-        try:
-            for raw in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-                if not raw or raw.lstrip().startswith("#"):
-                    continue
-                m = rx.match(raw)
-                if not m:
-                    continue
-                k, v = m.group(1), m.group(2).strip()
-                if len(v) >= 2 and ((v[0] == v[-1]) and v[0] in ("'", '"')):
-                    v = v[1:-1]
-                if k.startswith("export "):
-                    k = k.split(None, 1)[-1]
-                out[k] = v
-            break
-        except Exception:
-            pass
+        for raw in text.splitlines():
+            if not raw or raw.lstrip().startswith("#"):
+                continue
+            m = _RE_DOTENV_LINE.match(raw)
+            if not m:
+                continue
+            k, v = m.group(1), m.group(2).strip()
+            if len(v) >= 2 and ((v[0] == v[-1]) and v[0] in ("'", '"')):
+                v = v[1:-1]
+            if k.startswith("export "):
+                k = k.split(None, 1)[-1]
+            out[k] = v
+        break
     return out
 
 
@@ -90,11 +158,10 @@ def _env_block(text: str, env_name: str) -> str:
     envs = _extract_block(text, "environments")
     if not envs:
         return ""
-    m = re.search(rf"(?ms)^\s*{re.escape(env_name)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", envs)
-    return m.group("blk") if m else ""
+    return _extract_block(envs, env_name)
 
 
-def _db_url_from_config(text: str, env_name: str, root: Path) -> Optional[str]:
+def _db_url_from_config(text: str, env_name: str, root: Path, cfg: dict | None = None) -> Optional[str]:
     ev = os.getenv("DATABASE_URL")
     if ev and ev.strip():
         return ev.strip()
@@ -103,6 +170,13 @@ def _db_url_from_config(text: str, env_name: str, root: Path) -> Optional[str]:
     if env_map.get("DATABASE_URL"):
         return env_map["DATABASE_URL"].strip()
 
+    if cfg is not None:
+        return (
+            _cfg_str(cfg, "environments", env_name, "DATABASE_URL")
+            or _cfg_str(cfg, "default", "DATABASE_URL")
+            or _cfg_str(cfg, "DATABASE_URL")
+        )
+
     blk = _env_block(text, env_name)
     if blk:
         v = _kv_from_block(blk, "DATABASE_URL")
@@ -121,12 +195,19 @@ def _db_url_from_config(text: str, env_name: str, root: Path) -> Optional[str]:
     return None
 
 
-def _root_password(text: str, env_name: str) -> str:
+def _root_password(text: str, env_name: str, cfg: dict | None = None) -> str:
     """
     Return DB root password from config if provided, otherwise 'Password1'.
     - environments.<env>.root_pw
     - dev.root.password (legacy fallback)
     """
+    if cfg is not None:
+        return (
+            _cfg_str(cfg, "environments", env_name, "root_pw")
+            or _cfg_str(cfg, "dev", "root", "password")
+            or "Password1"
+        )
+
     blk = _env_block(text, env_name)
     v = _kv_from_block(blk, "root_pw") if blk else None
     if v:
@@ -134,8 +215,7 @@ def _root_password(text: str, env_name: str) -> str:
 
     dev_blk = _extract_block(text, "dev")
     if dev_blk:
-        m = re.search(r"(?ms)^\s*root\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", dev_blk)
-        sub = m.group("blk") if m else ""
+        sub = _extract_block(dev_blk, "root")
         v = _kv_from_block(sub, "password")
         if v:
             return v.strip()
@@ -183,91 +263,146 @@ def _parse_mysql_like(url: str) -> MySQLConn:
     return MySQLConn(host=host, port=port, user=user, password=pwd, db=db)
 
 
-def _cmd_base(conn: MySQLConn, *, use_db: bool = False) -> str:
+def _cmd_base(conn: MySQLConn, *, use_db: bool = False) -> Tuple[List[str], Optional[Dict[str, str]]]:
+    """
+    Return (argv, env) for the mysql client. The password travels in MYSQL_PWD
+    rather than argv so it is not visible in `ps` or echoed with the command.
+    """
     bin_ = _mysql_bin() or "mysql"
-    parts = [shlex.quote(bin_), "-h", shlex.quote(conn.host), "-P", str(conn.port), "-u", shlex.quote(conn.user)]
-    if conn.password:
-        parts.append(f"--password={shlex.quote(conn.password)}")
+    parts = [bin_, "-h", conn.host, "-P", str(conn.port), "-u", conn.user]
     if use_db and conn.db:
-        parts.extend(["-D", shlex.quote(conn.db)])
-    return " ".join(parts)
+        parts.extend(["-D", conn.db])
+    env = {**os.environ, "MYSQL_PWD": conn.password} if conn.password else None
+    return parts, env
 
 
-def _run(cmd: str) -> Tuple[int, str]:
+def _run(cmd: List[str], *, input: Optional[str] = None, env: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
     """
-    Run a shell command (we need shell for input redirection).
+    Run a command directly (no shell). `input`, if given, is fed to its stdin.
+    Output comes back as raw bytes; it is only decoded when printed.
     """
     console.command(cmd)
-    res = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    out = (res.stdout or "") + (res.stderr or "")
+    res = subprocess.run(
+        cmd, input=input.encode("utf-8") if input is not None else None, env=env, capture_output=True
+    )
+    out = res.stdout + res.stderr
     if res.returncode != 0:
-        console.error(out.strip() or f"Command failed: {cmd}")
+        console.error(out.decode("utf-8", "replace").strip() or f"Command failed: {' '.join(cmd)}")
     return int(res.returncode or 0), out
 
 
-def _wait_for_db(conn: MySQLConn, *, attempts: int = 60, delay: float = 1.0) -> bool:
-    ping = _cmd_base(conn) + " -e " + shlex.quote("SELECT 1;")
-    for _ in range(max(1, attempts)):
-        code, _ = _run(ping)
-        if code == 0:
-            return True
-        time.sleep(delay)
-    return False
+_LEDGER_TABLE = "schema_migrations"
 
+_LEDGER_DDL = f"""
+    CREATE TABLE IF NOT EXISTS `{_LEDGER_TABLE}` (
+      `name` VARCHAR(255) NOT NULL PRIMARY KEY,
+      `checksum` CHAR(64) NOT NULL,
+      `applied_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
 
-def _exec_sql(conn: MySQLConn, sql: str, *, use_db: bool = False) -> Tuple[int, str]:
-    cmd = _cmd_base(conn, use_db=use_db) + " -e " + shlex.quote(sql)
-    return _run(cmd)
 
+def _list_sql_files(db_dir: Path) -> List[Path]:
+    return sorted([p for p in db_dir.glob("*.sql") if p.is_file()], key=lambda x: x.name)
 
-def _exec_sql_file(conn: MySQLConn, path: Path, *, use_db: bool = False) -> Tuple[int, str]:
-    cmd = _cmd_base(conn, use_db=use_db) + " < " + shlex.quote(str(path))
-    return _run(cmd)
 
+def _file_checksum(p: Path) -> str:
+    with open(p, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
-_LEDGER_TABLE = "schema_migrations"
 
-def _ensure_ledger(conn: MySQLConn) -> int:
-    sql = f"""
-        CREATE TABLE IF NOT EXISTS `{_LEDGER_TABLE}` (
-          `name` VARCHAR(255) NOT NULL PRIMARY KEY,
-          `checksum` CHAR(64) NOT NULL,
-          `applied_at` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-    """
-    code, _ = _exec_sql(conn, sql, use_db=True)
-    return code
+# One "<name>\t<sha256>" row per line; the column header never matches the hex.
+_LEDGER_ROW_RX = re.compile(rb"(?m)^([^\t\n]+)\t([0-9a-f]{64})$")
 
 
-def _list_sql_files(db_dir: Path) -> List[Path]:
-    return sorted([p for p in db_dir.glob("*.sql") if p.is_file()], key=lambda x: x.name)
+def _parse_ledger(out: bytes) -> Dict[str, str]:
+    return {m.group(1).decode("utf-8", "replace"): m.group(2).decode("ascii") for m in _LEDGER_ROW_RX.finditer(out)}
 
 
-def _file_checksum(p: Path) -> str:
-    h = hashlib.sha256()
-    h.update(p.read_bytes())
-    return h.hexdigest()
+def _applied_cache_path(root: Path, env_name: str) -> Path:
+    return root / ".plsr" / f"applied-{env_name}.json"
+
 
+def _conn_key(conn: MySQLConn) -> str:
+    return f"{conn.host}:{conn.port}/{conn.db}"
 
-def _already_applied(conn: MySQLConn) -> Dict[str, str]:
-    code, out = _exec_sql(conn, f"SELECT name, checksum FROM `{_LEDGER_TABLE}`;", use_db=True)
-    if code != 0:
+
+def _read_applied_cache(path: Path, conn: MySQLConn) -> Dict[str, str]:
+    """
+    Ledger snapshot from the last run against this host/port/db; empty if the
+    cache is missing, unreadable or was written for a different target.
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("target") != _conn_key(conn):
         return {}
-    rows = [ln.strip().split("\t") for ln in out.strip().splitlines() if ln.strip()]
-    if rows and rows[0] and rows[0][0].lower() == "name":
-        rows = rows[1:]
-    return {name: cks for name, cks in rows if name}
+    applied = data.get("applied")
+    return applied if isinstance(applied, dict) else {}
 
 
-def _insert_ledger(conn: MySQLConn, name: str, checksum: str) -> int:
-    esc_name = name.replace("'", "''")
-    esc_ck = checksum.replace("'", "''")
-    sql = f"INSERT INTO `{_LEDGER_TABLE}` (`name`, `checksum`) VALUES ('{esc_name}', '{esc_ck}');"
-    code, _ = _exec_sql(conn, sql, use_db=True)
-    return code
+def _write_applied_cache(path: Path, conn: MySQLConn, applied: Dict[str, str]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"target": _conn_key(conn), "applied": applied}, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
 
+_BATCH_MARKER_RX = re.compile(rb"__plsr_marker_(\d+)__")
 
-def _ensure_db_and_user(root_conn: MySQLConn, svc_conn: MySQLConn) -> int:
+
+def _apply_batch(conn: MySQLConn, pending: List[Tuple[Path, str]]) -> Tuple[int, bytes]:
+    """
+    Apply all pending migrations through one mysql client: each file is
+    SOURCEd and immediately followed by its ledger INSERT. The client stops at
+    the first failing statement, so the ledger only records files that applied.
+    The INSERT is schema-qualified in case a migration switches databases.
+    Each section opens with a SELECT of a numbered marker so a failure can be
+    traced back to its file (see `_batch_failed_index`).
+    """
+    db = conn.db.replace("`", "``")
+    lines: List[str] = []
+    for i, (path, checksum) in enumerate(pending):
+        esc_name = path.name.replace("'", "''")
+        esc_ck = checksum.replace("'", "''")
+        lines.append(f"SELECT '__plsr_marker_{i}__';")
+        lines.append(f"SOURCE {path.resolve()}")
+        lines.append(
+            f"INSERT INTO `{db}`.`{_LEDGER_TABLE}` (`name`, `checksum`) VALUES ('{esc_name}', '{esc_ck}');"
+        )
+    argv, env = _cmd_base(conn, use_db=True)
+    return _run(argv, input="\n".join(lines) + "\n", env=env)
+
+
+def _batch_failed_index(out: bytes) -> int:
+    """
+    Index of the file whose section was running when the batch stopped,
+    i.e. the last marker echoed; 0 if none got through.
+    """
+    last = 0
+    for m in _BATCH_MARKER_RX.finditer(out):
+        last = int(m.group(1))
+    return last
+
+
+# Client-side errors (CR_*, 2xxx: can't connect, lost connection, ...) mean
+# the server is not up yet; anything else is a real failure.
+_CLIENT_ERROR_RX = re.compile(rb"ERROR 2\d{3}")
+
+
+def _ensure_db_and_user(
+    root_conn: MySQLConn, svc_conn: MySQLConn, *, attempts: int = 60, delay: float = 1.0
+) -> Tuple[Optional[int], Dict[str, str]]:
+    """
+    One root session creates the service DB, user, grants and the migration
+    ledger, then reads the ledger back. The session is retried while the
+    client cannot reach the server, which doubles as the readiness wait.
+    Returns (rc, applied); rc is None if the server never became reachable.
+    """
     db = svc_conn.db.replace("`", "``")
     usr = svc_conn.user.replace("`", "``")
     pw = svc_conn.password.replace("'", "''")
@@ -276,9 +411,21 @@ def _ensure_db_and_user(root_conn: MySQLConn, svc_conn: MySQLConn) -> int:
         f"CREATE USER IF NOT EXISTS '{usr}'@'%' IDENTIFIED BY '{pw}';",
         f"GRANT ALL ON `{db}`.* TO '{usr}'@'%';",
         "FLUSH PRIVILEGES;",
+        f"USE `{db}`;",
+        _LEDGER_DDL.strip(),
+        f"SELECT name, checksum FROM `{_LEDGER_TABLE}`;",
     ]
-    code, _ = _exec_sql(root_conn, " ".join(stmts), use_db=False)
-    return code
+    argv, env = _cmd_base(root_conn)
+    cmd = [*argv, "-e", " ".join(stmts)]
+    for i in range(max(1, attempts)):
+        code, out = _run(cmd, env=env)
+        if code == 0:
+            return 0, _parse_ledger(out)
+        if not _CLIENT_ERROR_RX.search(out):
+            return code, {}
+        if i + 1 < attempts:
+            time.sleep(delay)
+    return None, {}
 
 
 
@@ -302,7 +449,8 @@ def migrate(env_name: str) -> int:
         console.error(f"No config.yaml found under {root}")
         return 2
 
-    url = _db_url_from_config(cfg, env_name, root)
+    cfg_dict = _load_config_dict(root)
+    url = _db_url_from_config(cfg, env_name, root, cfg_dict)
     if not url:
         console.error("DATABASE_URL is required (in environments.<env>, default, .env, or env var).")
         console.tip(f"Searched: {root/'config.yaml'} and .env files")
@@ -318,44 +466,54 @@ def migrate(env_name: str) -> int:
     console.info(f"Env:    {env_name}")
     console.info(f"Target: {svc_conn.user}@{svc_conn.host}:{svc_conn.port}/{svc_conn.db}")
 
+    db_dir = root / "db"
+    files = _list_sql_files(db_dir) if db_dir.is_dir() else []
+
+    # sha256 releases the GIL, so hashing many files in threads overlaps I/O and CPU.
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4, len(files))) as ex:
+            checksums = list(ex.map(_file_checksum, files))
+    else:
+        checksums = [_file_checksum(p) for p in files]
+
+    # Opt-in only: the cache cannot tell that the DB was recreated (e.g. `plsr <env> stop`
+    # wipes the local data dir), so by default the DB is always checked below.
+    cache_path = _applied_cache_path(root, env_name)
+    if os.getenv("PLSR_MIGRATE_TRUST_CACHE") == "1":
+        cached = _read_applied_cache(cache_path, svc_conn)
+        if files and all(cached.get(p.name) == ck for p, ck in zip(files, checksums)):
+            console.info(f"All {len(files)} migrations recorded in {cache_path.name}; skipping DB check.")
+            console.success("All migrations are up to date.")
+            return 0
 
     root_conn = MySQLConn(
         host=svc_conn.host,
         port=svc_conn.port,
         user="root",
-        password=_root_password(cfg, env_name),
+        password=_root_password(cfg, env_name, cfg_dict),
         db="mysql",
     )
 
     console.info("Waiting for DB to become ready…")
-    if not _wait_for_db(root_conn, attempts=60, delay=1.0):
+    rc, applied = _ensure_db_and_user(root_conn, svc_conn, attempts=60, delay=1.0)
+    if rc is None:
         console.error("Database is not reachable at the configured host/port.")
         console.tip("Ensure the DB microservice is running (e.g., svc-db) and ports match your DATABASE_URL.")
         return 1
-
-    rc = _ensure_db_and_user(root_conn, svc_conn)
     if rc != 0:
         return rc
 
-    rc = _ensure_ledger(svc_conn)
-    if rc != 0:
-        return rc
-
-    db_dir = root / "db"
     if not db_dir.is_dir():
         console.warn(f"No 'db/' directory at {db_dir}. Nothing to migrate.")
         return 0
 
-    files = _list_sql_files(db_dir)
     if not files:
         console.warn("No SQL files found under db/. Nothing to migrate.")
         return 0
 
-    applied = _already_applied(svc_conn)
-
-    for path in files:
+    pending: List[Tuple[Path, str]] = []
+    for path, checksum in zip(files, checksums):
         name = path.name
-        checksum = _file_checksum(path)
 
         if applied.get(name) == checksum:
             console.info(f"✓ {name} (already applied)")
@@ -366,18 +524,24 @@ def migrate(env_name: str) -> int:
             console.tip("Create a new numbered migration file instead.")
             return 1
 
-        console.info(f"→ Applying {name} …")
-        code, out = _exec_sql_file(svc_conn, path, use_db=True)
+        pending.append((path, checksum))
+
+    if pending:
+        for path, _ in pending:
+            console.info(f"→ Applying {path.name} …")
+        code, out = _apply_batch(svc_conn, pending)
         if code != 0:
-            console.error(out if out else f"Migration failed: {name}")
+            failed = _batch_failed_index(out)
+            for path, checksum in pending[:failed]:
+                applied[path.name] = checksum
+                console.success(f"Applied {path.name}")
+            _write_applied_cache(cache_path, svc_conn, applied)
+            console.error(f"Migration failed: {pending[failed][0].name}")
             return code
+        for path, checksum in pending:
+            applied[path.name] = checksum
+            console.success(f"Applied {path.name}")
 
-        rec = _insert_ledger(svc_conn, name, checksum)
-        if rec != 0:
-            console.error(f"Failed to record migration in ledger: {name}")
-            return rec
-
-        console.success(f"Applied {name}")
-
+    _write_applied_cache(cache_path, svc_conn, applied)
     console.success("All migrations are up to date.")
     return 0
@@ -2,55 +2,176 @@ from __future__ import annotations
 
 import os
 import re
-import shlex
 import shutil
+import signal
 import json
-import base64
-import tempfile
 import subprocess
+import sys
+import threading
 import time
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 
 from .console import console
-from .aws import parse_ecr_image_ref, aws_sts_identity, ecr_get_login_password
 
-def _detect_app_root() -> Path:
-    env_root = os.getenv("APP_ROOT")
+# PyYAML, plsr.aws, base64 and hashlib are imported where they are used, so
+# early exits (no helm, no config.yaml) and non-ECR releases skip them.
+
+@lru_cache(maxsize=4)
+def _detect_app_root_cached(cwd: str, env_root: str | None) -> Path:
     if env_root:
         p = Path(env_root).expanduser().resolve()
         if p.is_dir():
             return p
-    cur = Path.cwd().resolve()
+    cur = Path(cwd).resolve()
     for p in (cur, *cur.parents):
         if (p / "config.yaml").is_file():
             return p
     return cur
 
+def _detect_app_root() -> Path:
+    # Keyed on CWD and APP_ROOT so a chdir or env change still re-resolves.
+    return _detect_app_root_cached(os.getcwd(), os.getenv("APP_ROOT"))
+
+@lru_cache(maxsize=8)
+def _read_cfg_text_cached(path_str: str, mtime_ns: int) -> str:
+    with open(path_str, encoding="utf-8") as f:
+        return f.read()
+
 def _read_cfg_text(root: Path) -> str | None:
     cfg = root / "config.yaml"
-    return cfg.read_text(encoding="utf-8") if cfg.is_file() else None
+    try:
+        st = os.stat(cfg)
+    except OSError:
+        return None
+    return _read_cfg_text_cached(str(cfg), st.st_mtime_ns)
+
+_RE_LITE_KV = re.compile(r"""^(["']?)([^"':#]+?)\1\s*:(?:\s+(.*))?$""")
+
+def _lite_strip_comment(line: str) -> str:
+    quote = ""
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "#" and (i == 0 or line[i - 1] in " \t"):
+            return line[:i]
+    return line
+
+def _lite_scalar(val: str) -> str:
+    val = val.strip()
+    if len(val) >= 2 and val[0] == val[-1] and val[0] in "\"'":
+        return val[1:-1]
+    return val
+
+def _yaml_lite(text: str) -> dict:
+    """
+    Indentation-only reader for the no-PyYAML case: nested mappings, block
+    lists of scalars, quoted or plain scalars (kept as strings, like
+    BaseLoader). One pass; anything fancier (flow/multi-line scalars) is
+    kept as its raw text or skipped.
+    """
+    root: dict = {}
+    stack: list[tuple[int | None, dict | list]] = [(None, root)]
+    pending: tuple[dict, str, int] | None = None
+    for raw in text.splitlines():
+        line = _lite_strip_comment(raw).rstrip()
+        body = line.lstrip(" ")
+        if not body or body in ("---", "..."):
+            continue
+        indent = len(line) - len(body)
+        is_item = body == "-" or body.startswith("- ")
+
+        if pending is not None:
+            parent, key, key_indent = pending
+            pending = None
+            if indent > key_indent or (indent == key_indent and is_item):
+                child: dict | list = [] if is_item else {}
+                parent[key] = child
+                stack.append((indent, child))
+
+        # Dedent closes containers; so does a key line at the level of a `key:\n- item` list.
+        while len(stack) > 1 and (
+            indent < (stack[-1][0] or 0)
+            or (not is_item and isinstance(stack[-1][1], list) and indent == stack[-1][0])
+        ):
+            stack.pop()
+        entry_indent, cont = stack[-1]
+        if entry_indent is None:
+            stack[-1] = (indent, cont)
+        elif indent != entry_indent:
+            continue
+
+        if isinstance(cont, list):
+            if is_item:
+                cont.append(_lite_scalar(body[1:]))
+            continue
+        m = _RE_LITE_KV.match(body) if not is_item else None
+        if not m:
+            continue
+        key, val = m.group(2).strip(), (m.group(3) or "").strip()
+        if val:
+            cont[key] = _lite_scalar(val)
+        else:
+            cont[key] = ""
+            pending = (cont, key, indent)
+    return root
 
-def _extract_block(text: str, section: str) -> str:
-    m = re.search(rf"(?ms)^\s*{re.escape(section)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", text)
-    return m.group("blk") if m else ""
+@lru_cache(maxsize=8)
+def _load_cfg_cached(path_str: str, mtime_ns: int) -> dict:
+    """
+    Parse config.yaml once per (path, mtime) with PyYAML's (C)BaseLoader so
+    scalars stay strings. Without PyYAML, or if it rejects the file, the
+    indentation reader above covers the keys the release needs.
+    """
+    text = _read_cfg_text_cached(path_str, mtime_ns)
+    try:
+        import yaml as _yaml
+    except ImportError:
+        _yaml = None
+    if _yaml is not None:
+        loader = getattr(_yaml, "CBaseLoader", None) or _yaml.BaseLoader
+        try:
+            data = _yaml.load(text, Loader=loader)
+        except Exception:
+            data = None
+        if isinstance(data, dict):
+            return data
+    return _yaml_lite(text)
 
-def _kv_from_block(block: str, key: str) -> str | None:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", block)
-    return m.group(1).strip() if m else None
+def _load_cfg(root: Path) -> dict:
+    cfg = root / "config.yaml"
+    try:
+        st = os.stat(cfg)
+    except OSError:
+        return {}
+    return _load_cfg_cached(str(cfg), st.st_mtime_ns)
+
+def _cfg_str(cfg: dict, *path: str) -> str | None:
+    cur = cfg
+    for key in path:
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(key)
+    if not isinstance(cur, str):
+        return None
+    return cur.strip() or None
 
-def _kv_top(text: str, key: str) -> str | None:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", text)
-    return m.group(1).strip() if m else None
+# Registry hosts are ASCII; re.A skips Unicode case folding.
+_RE_ECR_PRIVATE = re.compile(r'[0-9]{12}\.dkr\.ecr\.[a-z0-9-]+\.amazonaws\.com', re.I | re.A)
+_RE_ECR_PUBLIC = re.compile(r'public\.ecr\.aws/[A-Za-z0-9-]+', re.I | re.A)
 
-def _name_version(text: str, root: Path) -> tuple[str, str]:
-    return (_kv_top(text, "name") or root.name, _kv_top(text, "version") or "0.0.0")
+def _name_version(cfg: dict, root: Path) -> tuple[str, str]:
+    return (_cfg_str(cfg, "name") or root.name, _cfg_str(cfg, "version") or "0.0.0")
 
-def _flavor(text: str) -> str:
-    svc = _extract_block(text, "service")
-    fl = (_kv_from_block(svc, "flavor") or "").lower().strip()
+def _flavor(cfg: dict) -> str:
+    fl = (_cfg_str(cfg, "service", "flavor") or "").lower()
     return "db-mariadb" if fl in ("mariadb", "mysql", "db-mariadb", "db_mysql") else "python-app"
 
-def _ecr_root(text: str) -> str | None:
+def _ecr_root(text: str, cfg: dict) -> str | None:
     """
     Try env → explicit top-level ECR: → any ECR host in the file.
     """
@@ -59,85 +180,69 @@ def _ecr_root(text: str) -> str | None:
         if v and v.strip():
             return v.strip().rstrip("/")
 
-    m_explicit = re.search(r'(?mi)^\s*ECR\s*:\s*["\']?([^"\']+?)["\']?\s*$', text)
-    if m_explicit:
-        return m_explicit.group(1).strip().rstrip("/")
+    explicit = _cfg_str(cfg, "ECR")
+    if explicit:
+        return explicit.rstrip("/")
 
-    m_priv = re.search(r'([0-9]{12}\.dkr\.ecr\.[a-z0-9-]+)\.amazonaws\.com', text, re.I)
+    m_priv = _RE_ECR_PRIVATE.search(text)
     if m_priv:
         return m_priv.group(0).strip().rstrip("/")
 
-    m_pub = re.search(r'(public\.ecr\.aws/[A-Za-z0-9-]+)', text, re.I)
+    m_pub = _RE_ECR_PUBLIC.search(text)
     if m_pub:
-        return m_pub.group(1).strip().rstrip("/")
+        return m_pub.group(0).strip().rstrip("/")
 
     return None
 
-def _image_repository(text: str, service_name: str) -> str | None:
+def _image_repository(cfg: dict) -> str | None:
     """
     Prefer an explicit image.repository from config.yaml.
     If missing, return None (caller may fall back to ECR/name).
     """
-    img_blk = _extract_block(text, "image")
-    repo = _kv_from_block(img_blk, "repository")
-    if repo:
-        return repo.strip()
-    m = re.search(r'(?mi)^\s*image\.repository\s*:\s*["\']?([^"\']+?)["\']?\s*$', text)
-    if m:
-        return m.group(1).strip()
-    return None
+    return _cfg_str(cfg, "image", "repository") or _cfg_str(cfg, "image.repository")
 
-def _db_env_values(text: str, env_name: str) -> tuple[str, str | None, str | None, str | None]:
-    envs = _extract_block(text, "environments")
-    blk = ""
-    if envs:
-        m = re.search(rf"(?ms)^\s*{re.escape(env_name)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", envs)
-        blk = m.group("blk") if m else ""
-    root_pw = _kv_from_block(blk, "root_pw")
-    if not root_pw:
-        dev = _extract_block(text, "dev")
-        if dev:
-            root = _extract_block(dev, "root")
-            root_pw = _kv_from_block(root, "password") or root_pw
-    db_blk  = _extract_block(blk, "database")
-    db_name = _kv_from_block(db_blk, "name")
-    db_user = _kv_from_block(db_blk, "user")
-    db_pw   = _kv_from_block(db_blk, "password")
-    return (root_pw or "Password1"), db_name, db_user, db_pw
+def _db_env_values(cfg: dict, env_name: str) -> tuple[str, str | None, str | None, str | None]:
+    env = ("environments", env_name)
+    root_pw = _cfg_str(cfg, *env, "root_pw") or _cfg_str(cfg, "dev", "root", "password")
+    return (
+        root_pw or "Password1",
+        _cfg_str(cfg, *env, "database", "name"),
+        _cfg_str(cfg, *env, "database", "user"),
+        _cfg_str(cfg, *env, "database", "password"),
+    )
 
 
+@lru_cache(maxsize=8)
 def _have(cmd: str) -> bool:
     return shutil.which(cmd) is not None
 
-def _ensure_namespace(ns: str) -> int:
-    if not _have("kubectl"):
-        console.warn("kubectl not found on PATH; relying on Helm to create namespace.")
-        return 0
-    cmd = f"kubectl get ns {shlex.quote(ns)} >/dev/null 2>&1 || kubectl create namespace {shlex.quote(ns)}"
-    return console.run(cmd)
-
-def _adopt_for_helm(ns: str, kind: str, name: str, release_name: str) -> int:
+def _helm_owned_metadata(*, ns: str, name: str, release_name: str) -> str:
     """
-    Add Helm ownership labels/annotations so Helm can adopt an existing resource.
+    metadata: block carrying Helm's ownership label/annotations, so Helm can
+    adopt the resource on `upgrade --install` without a kubectl label/annotate.
     """
-    if not _have("kubectl"):
-        return 0
-    rc = 0
-    rc |= console.run(f"kubectl -n {shlex.quote(ns)} label {kind} {shlex.quote(name)} app.kubernetes.io/managed-by=Helm --overwrite")
-    rc |= console.run(
-        "kubectl -n {ns} annotate {kind} {name} "
-        "meta.helm.sh/release-name={rel} meta.helm.sh/release-namespace={ns} --overwrite"
-        .format(ns=shlex.quote(ns), kind=kind, name=shlex.quote(name), rel=shlex.quote(release_name))
+    return (
+        "metadata:\n"
+        f"  name: {name}\n"
+        f"  namespace: {ns}\n"
+        "  labels:\n"
+        "    app.kubernetes.io/managed-by: Helm\n"
+        "  annotations:\n"
+        f"    meta.helm.sh/release-name: {release_name}\n"
+        f"    meta.helm.sh/release-namespace: {ns}\n"
     )
-    return rc
 
+def _write_namespace_yaml(ns: str) -> str:
+    return f"apiVersion: v1\nkind: Namespace\nmetadata:\n  name: {ns}\n"
 
-
-def _write_dockerconfigjson_secret_yaml(*, ns: str, name: str, registry: str, username: str, password: str) -> str:
+def _write_dockerconfigjson_secret_yaml(*, ns: str, name: str, registry: str, username: str, password: str, release_name: str) -> str:
     """
     Create a Secret manifest (YAML text) of type kubernetes.io/dockerconfigjson
-    without exposing the password in the command line.
+    without exposing the password in the command line. The two base64 layers
+    are what the format requires (`auth` inside the JSON, then the JSON as
+    Secret data); the JSON itself is compact to keep the Secret small.
     """
+    import base64
     auth = base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("ascii")
     cfg = {
         "auths": {
@@ -149,205 +254,341 @@ def _write_dockerconfigjson_secret_yaml(*, ns: str, name: str, registry: str, us
             }
         }
     }
-    cfg_b64 = base64.b64encode(json.dumps(cfg).encode("utf-8")).decode("ascii")
+    cfg_b64 = base64.b64encode(json.dumps(cfg, separators=(",", ":")).encode("ascii")).decode("ascii")
     return (
         "apiVersion: v1\n"
         "kind: Secret\n"
         "type: kubernetes.io/dockerconfigjson\n"
-        "metadata:\n"
-        f"  name: {name}\n"
-        f"  namespace: {ns}\n"
+        f"{_helm_owned_metadata(ns=ns, name=name, release_name=release_name)}"
         "data:\n"
         f"  .dockerconfigjson: {cfg_b64}\n"
     )
 
-def _ensure_ecr_pull_secret(ns: str, secret_name: str, registry_host: str, password: str) -> int:
-    if not _have("kubectl"):
-        console.error("kubectl is required to create image pull secrets.")
-        return 127
-    yaml_text = _write_dockerconfigjson_secret_yaml(
-        ns=ns, name=secret_name, registry=registry_host, username="AWS", password=password
+def _write_opaque_secret_yaml(*, ns: str, name: str, kv: dict[str, str], release_name: str) -> str:
+    """
+    Opaque Secret manifest from a key/value map; values never reach a command line.
+    """
+    import base64
+    data = "".join(
+        f"  {k}: {base64.b64encode((v or '').encode('utf-8')).decode('ascii')}\n" for k, v in (kv or {}).items()
+    )
+    return (
+        "apiVersion: v1\n"
+        "kind: Secret\n"
+        f"{_helm_owned_metadata(ns=ns, name=name, release_name=release_name)}"
+        "type: Opaque\n"
+        "data:\n"
+        f"{data}"
     )
-    tmp = None
-    try:
-        tmp = tempfile.NamedTemporaryFile(prefix="plsr-ecr-", suffix=".yaml", delete=False)
-        tmp.write(yaml_text.encode("utf-8"))
-        tmp.flush()
-        tmp.close()
-        return console.run(["kubectl", "apply", "-f", tmp.name])
-    finally:
-        try:
-            if tmp and tmp.name:
-                os.unlink(tmp.name)
-        except Exception:
-            pass
-
 
-def _apply_opaque_secret(ns: str, name: str, kv: dict[str, str]) -> int:
+def _apply_manifests(docs: list[str]) -> int:
     """
-    Create/refresh an Opaque Secret from a key/value map without logging values.
+    Apply several manifests with one `kubectl apply` (one process, one API
+    discovery) instead of a kubectl per resource. Documents apply in order.
     """
-    if not _have("kubectl"):
-        console.error("kubectl is required to create secrets.")
-        return 127
-    lines = [
-        "apiVersion: v1",
-        "kind: Secret",
-        f"metadata:\n  name: {name}\n  namespace: {ns}",
-        "type: Opaque",
-        "data:",
-    ]
-    for k, v in (kv or {}).items():
-        enc = base64.b64encode((v or "").encode("utf-8")).decode("ascii")
-        lines.append(f"  {k}: {enc}")
-    yaml_text = "\n".join(lines) + "\n"
-
-    tmp = None
-    try:
-        tmp = tempfile.NamedTemporaryFile(prefix="plsr-sm-", suffix=".yaml", delete=False)
-        tmp.write(yaml_text.encode("utf-8"))
-        tmp.flush()
-        tmp.close()
-        return console.run(["kubectl", "apply", "-f", tmp.name])
-    finally:
-        try:
-            if tmp and tmp.name:
-                os.unlink(tmp.name)
-        except Exception:
-            pass
+    yaml_text = "---\n".join(docs)
+    return console.run(["kubectl", "apply", "-f", "-"], input=yaml_text.encode("utf-8"))
 
 
 def _rand_suffix() -> str:
-    return base64.urlsafe_b64encode(os.urandom(4)).decode("ascii").rstrip("=").lower()
+    import secrets
+    return secrets.token_hex(3)
 
 def _write_pullcheck_pod_yaml(*, ns: str, name: str, image: str, secret: str | None) -> str:
     """
     Pod spec that attempts to pull <image>. We don't require the container to fully
     run to "Ready"; success is determined by imageID being populated.
     """
-    lines = [
-        "apiVersion: v1",
-        "kind: Pod",
-        "metadata:",
-        f"  name: {name}",
-        f"  namespace: {ns}",
-        "  labels:",
-        "    app.kubernetes.io/name: plsr-pullcheck",
-        "spec:",
-        "  restartPolicy: Never",
-    ]
-    if secret:
-        lines += ["  imagePullSecrets:", f"  - name: {secret}"]
-    lines += [
-        "  containers:",
-        "  - name: pullcheck",
-        f"    image: {image}",
-        "    imagePullPolicy: Always",
-        "    command: [\"/bin/sh\", \"-c\"]",
-        "    args: [\"sleep 5\"]",
-    ]
-    return "\n".join(lines) + "\n"
+    pull_secrets = f"  imagePullSecrets:\n  - name: {secret}\n" if secret else ""
+    return (
+        "apiVersion: v1\n"
+        "kind: Pod\n"
+        "metadata:\n"
+        f"  name: {name}\n"
+        f"  namespace: {ns}\n"
+        "  labels:\n"
+        "    app.kubernetes.io/name: plsr-pullcheck\n"
+        "spec:\n"
+        "  restartPolicy: Never\n"
+        f"{pull_secrets}"
+        "  containers:\n"
+        "  - name: pullcheck\n"
+        f"    image: {image}\n"
+        "    imagePullPolicy: Always\n"
+        "    command: [\"/bin/sh\", \"-c\"]\n"
+        "    args: [\"sleep 5\"]\n"
+    )
 
-def _pod_status_json(ns: str, pod: str) -> dict | None:
-    """
-    Return pod JSON or None.
-    """
-    cmd = ["kubectl", "-n", ns, "get", "pod", pod, "-o", "json"]
-    console.command(cmd)
-    res = subprocess.run(cmd, capture_output=True, text=True)
-    if res.returncode != 0:
-        return None
-    try:
-        return json.loads(res.stdout or "{}")
-    except Exception:
-        return None
+# Our fds are non-inheritable (PEP 446), so on Linux the kubectl polling
+# spawns can skip the close-every-fd pass in the child.
+_CLOSE_FDS = sys.platform != "linux"
 
 def _delete_pod(ns: str, pod: str) -> None:
     cmd = ["kubectl", "-n", ns, "delete", "pod", pod, "--ignore-not-found", "--wait=false"]
     console.command(cmd)
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=_CLOSE_FDS)
+
+_PULL_FAIL_REASONS = frozenset({
+    "ErrImagePull", "ImagePullBackOff", "RegistryUnavailable", "InvalidImageName", "Unauthorized", "Forbidden",
+})
 
-def _verify_namespace_can_pull_image(*, ns: str, image: str, release_name: str, secret: str | None) -> int:
+# One "imageID|waiting.reason|waiting.message" line per pod update.
+_PULLCHECK_JSONPATH = (
+    "{.status.containerStatuses[0].imageID}{\"|\"}"
+    "{.status.containerStatuses[0].state.waiting.reason}{\"|\"}"
+    "{.status.containerStatuses[0].state.waiting.message}{\"\\n\"}"
+)
+
+def _pull_verdict(line: str) -> tuple[bool, str, str] | None:
     """
-    Launch a short-lived pod that uses <image>. We consider it a success as soon as
-    the Kubelet reports a non-empty imageID for the container. If we encounter
-    ErrImagePull/ImagePullBackOff/etc., we fail and abort Helm release.
+    Read one _PULLCHECK_JSONPATH line: ok once imageID is set, failed on a
+    terminal pull error, None while the pull is still pending.
     """
-    if not _have("kubectl"):
-        console.error("kubectl is required for image pull preflight.")
-        return 127
+    image_id, _, rest = line.rstrip("\n").partition("|")
+    reason, _, message = rest.partition("|")
+    if image_id.strip():
+        return True, "", ""
+    reason = reason.strip()
+    if reason in _PULL_FAIL_REASONS:
+        return False, reason, message.strip()
+    return None
 
-    pod_name = f"pullcheck-{release_name}-{_rand_suffix()}"
-    yaml_text = _write_pullcheck_pod_yaml(ns=ns, name=pod_name, image=image, secret=secret)
+def _pod_status_fields(ns: str, pod: str) -> str | None:
+    """
+    The pod's imageID|reason|message line (only those fields, no full JSON), or None.
+    """
+    cmd = ["kubectl", "-n", ns, "get", "pod", pod, "-o", f"jsonpath={_PULLCHECK_JSONPATH}"]
+    console.command(cmd)
+    res = subprocess.run(cmd, capture_output=True, text=True, close_fds=_CLOSE_FDS)
+    return res.stdout if res.returncode == 0 else None
 
-    tmp = None
+def _kill_group(proc: subprocess.Popen) -> None:
+    # Kill the whole session so a wrapper script's children release the pipe too.
     try:
-        tmp = tempfile.NamedTemporaryFile(prefix="plsr-pullcheck-", suffix=".yaml", delete=False)
-        tmp.write(yaml_text.encode("utf-8"))
-        tmp.flush()
-        tmp.close()
-
-        rc = console.run(["kubectl", "apply", "-f", tmp.name])
-        if rc != 0:
-            console.error("Failed to create pullcheck pod.")
-            return rc
-
-        timeout_s = int(os.getenv("plsr_ECR_PULLCHECK_TIMEOUT", "120"))
-        deadline = time.time() + max(10, timeout_s)
-        last_reason = ""
-        last_message = ""
-        while time.time() < deadline:
-            obj = _pod_status_json(ns, pod_name)
-            if not obj:
-                time.sleep(2)
-                continue
-            statuses = (obj.get("status") or {}).get("containerStatuses") or []
-            if statuses:
-                st = statuses[0] or {}
-                image_id = st.get("imageID") or ""
-                if image_id:
-                    console.success("Cluster verified: image pulled successfully.")
-                    return 0
-                waiting = (st.get("state") or {}).get("waiting") or {}
-                reason = (waiting.get("reason") or "").strip()
-                message = (waiting.get("message") or "").strip()
-                if reason in {"ErrImagePull", "ImagePullBackOff", "RegistryUnavailable", "InvalidImageName", "Unauthorized", "Forbidden"}:
-                    last_reason, last_message = reason, message
-                    break
-            time.sleep(2)
-
-        if last_reason:
-            console.error(f"Image pull preflight failed: {last_reason}: {last_message}")
+        if os.name != "nt":
+            os.killpg(proc.pid, signal.SIGKILL)
         else:
-            console.error("Image pull preflight did not succeed before timeout.")
-            console.tip("Check node egress, cluster DNS, and image/credentials. Inspect events with: kubectl describe pod …")
-        return 1
+            proc.kill()
+    except OSError:
+        pass
+
+def _watch_image_pull(ns: str, pod: str, deadline: float) -> tuple[bool, str, str] | None:
+    """
+    Follow the pod through one `kubectl get -w` stream and return as soon as it
+    reports an imageID (ok) or a pull error. None if the stream ends or times
+    out first.
+    """
+    cmd = ["kubectl", "-n", ns, "get", "pod", pod, "-w", "-o", f"jsonpath={_PULLCHECK_JSONPATH}"]
+    console.command(cmd)
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, encoding="utf-8", errors="replace",
+        start_new_session=(os.name != "nt"), close_fds=_CLOSE_FDS,
+    )
+    timer = threading.Timer(max(0.0, deadline - time.monotonic()), _kill_group, args=(proc,))
+    timer.start()
+    try:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            verdict = _pull_verdict(line)
+            if verdict:
+                return verdict
+        return None
     finally:
-        try:
-            if tmp and tmp.name:
-                os.unlink(tmp.name)
-        except Exception:
-            pass
-        _delete_pod(ns, pod_name)
+        timer.cancel()
+        if proc.poll() is None:
+            _kill_group(proc)
+        proc.wait()
 
+def _poll_image_pull(ns: str, pod: str, deadline: float) -> tuple[bool, str, str]:
+    """
+    Fallback for when the watch drops early: poll the pod status until deadline,
+    starting at 150ms and backing off to 2s since early transitions are quick.
+    """
+    delay = 0.15
+    while time.monotonic() < deadline:
+        line = _pod_status_fields(ns, pod)
+        verdict = _pull_verdict(line) if line is not None else None
+        if verdict:
+            return verdict
+        time.sleep(delay)
+        delay = min(2.0, delay * 1.5)
+    return False, "", ""
+
+def _await_image_pull(*, ns: str, pod_name: str) -> int:
+    """
+    Wait on the pullcheck pod. We consider it a success as soon as the Kubelet
+    reports a non-empty imageID for the container. If we encounter
+    ErrImagePull/ImagePullBackOff/etc., we fail and abort Helm release.
+    """
+    timeout_s = int(os.getenv("plsr_ECR_PULLCHECK_TIMEOUT", "120"))
+    deadline = time.monotonic() + max(10, timeout_s)
+    verdict = _watch_image_pull(ns, pod_name, deadline)
+    if verdict is None:
+        verdict = _poll_image_pull(ns, pod_name, deadline)
+    ok, last_reason, last_message = verdict
+    if ok:
+        console.success("Cluster verified: image pulled successfully.")
+        return 0
 
-def _preflight_ecr_for_k8s_pull(*, namespace: str, image_repo: str, tag: str, release_name: str) -> tuple[list[str], int]:
+    if last_reason:
+        console.error(f"Image pull preflight failed: {last_reason}: {last_message}")
+    else:
+        console.error("Image pull preflight did not succeed before timeout.")
+        console.tip("Check node egress, cluster DNS, and image/credentials. Inspect events with: kubectl describe pod …")
+    return 1
+
+
+# ECR tokens live 12h; stamp 11h and only reuse one with over an hour left.
+_ECR_TOKEN_TTL_S = 11 * 3600
+_ECR_TOKEN_MIN_LEFT_S = 3600
+
+def _ecr_token_cache_path(region: str) -> Path:
     """
-    If using ECR, ensure:
-      • (private ECR) AWS creds/region are valid (sts get-caller-identity),
-        obtain ECR token, create docker-registry Secret in the namespace,
-      • Then launch a pullcheck Pod in the *cluster* namespace using the target image
-        to verify the cluster can actually pull it.
-      • (public ECR) run the same pullcheck without a secret.
+    Per region and per credential source (profile / access key, hashed), so
+    switching AWS accounts never picks up another account's token.
+    """
+    import hashlib
+    scope = f"{os.getenv('AWS_PROFILE', '')}|{os.getenv('AWS_ACCESS_KEY_ID', '')}"
+    digest = hashlib.sha256(scope.encode("utf-8")).hexdigest()[:12]
+    base = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "plsr" / f"ecr-{region}-{digest}.json"
+
+def _cached_ecr_password(region: str) -> str | None:
+    if os.getenv("PLSR_NO_TOKEN_CACHE") == "1":
+        return None
+    try:
+        data = json.loads(_ecr_token_cache_path(region).read_text(encoding="utf-8"))
+        token, expires_at = str(data["token"]), float(data["expires_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    left = expires_at - time.time()
+    if not token or left < _ECR_TOKEN_MIN_LEFT_S:
+        return None
+    console.info(f"Using cached ECR token (valid ~{int(left // 3600)}h more; PLSR_NO_TOKEN_CACHE=1 to refresh).")
+    return token
 
-    Returns (extra_helm_sets, exit_code) — non-zero exit aborts Helm release.
+def _store_ecr_password(region: str, token: str) -> None:
+    # Owner-only file, written under a temp name and renamed into place.
+    path = _ecr_token_cache_path(region)
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"token": token, "expires_at": time.time() + _ECR_TOKEN_TTL_S}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+# One line per node: the space-separated names of the images it holds.
+_NODE_IMAGES_JSONPATH = "{range .items[*]}{range .status.images[*]}{.names[*]}{\" \"}{end}{\"\\n\"}{end}"
+
+def _image_present_on_all_nodes(image_ref: str) -> bool:
+    """
+    True when every node already lists `image_ref` in status.images (warm
+    redeploys). Nodes only report their most recent images, so a miss just
+    means the pullcheck pod runs as usual.
+    """
+    cmd = ["kubectl", "get", "nodes", "-o", f"jsonpath={_NODE_IMAGES_JSONPATH}"]
+    console.command(cmd)
+    res = subprocess.run(cmd, capture_output=True, text=True, close_fds=_CLOSE_FDS)
+    if res.returncode != 0:
+        return False
+    nodes = [line.split() for line in res.stdout.splitlines()]
+    return bool(nodes) and all(image_ref in names for names in nodes)
+
+@dataclass
+class _PullPreflight:
+    docs: list[str] = field(default_factory=list)
+    helm_sets: list[str] = field(default_factory=list)
+    pod: str | None = None
+    verify_key: str | None = None
+
+# A successful pullcheck is reused for 10 minutes for the same cluster,
+# namespace, image and registry credentials.
+_PULLCHECK_TTL_S = 600.0
+
+def _pullcheck_cache_path() -> Path:
+    base = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "plsr" / "pullcheck.json"
+
+def _kube_scope() -> str:
+    """
+    Kubeconfig path(s) + mtime: a context switch rewrites the file, which
+    invalidates earlier verifications without spawning kubectl.
+    """
+    paths = os.getenv("KUBECONFIG") or str(Path.home() / ".kube" / "config")
+    parts = []
+    for p in paths.split(os.pathsep):
+        try:
+            parts.append(f"{p}:{os.stat(p).st_mtime_ns}")
+        except OSError:
+            parts.append(p)
+    return "|".join(parts)
+
+def _pullcheck_key(ns: str, image_ref: str, password: str) -> str:
+    import hashlib
+    secret = hashlib.sha256(password.encode("utf-8")).hexdigest()[:16] if password else ""
+    raw = f"{_kube_scope()}\0{ns}\0{image_ref}\0{secret}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+def _read_pullcheck_cache() -> dict:
+    try:
+        data = json.loads(_pullcheck_cache_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _recently_verified(key: str) -> bool:
+    if os.getenv("PLSR_SKIP_PULLCHECK_CACHE") == "1":
+        return False
+    stamp = _read_pullcheck_cache().get(key)
+    return isinstance(stamp, (int, float)) and time.time() - stamp < _PULLCHECK_TTL_S
+
+def _mark_verified(key: str) -> None:
+    now = time.time()
+    data = {
+        k: v for k, v in _read_pullcheck_cache().items()
+        if isinstance(v, (int, float)) and now - v < _PULLCHECK_TTL_S
+    }
+    data[key] = now
+    path = _pullcheck_cache_path()
+    tmp = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def _preflight_ecr_for_k8s_pull(
+    *, namespace: str, image_repo: str, tag: str, release_name: str
+) -> tuple[_PullPreflight, int]:
+    """
+    If using ECR, prepare:
+      • (private ECR) AWS creds/region are valid (sts get-caller-identity),
+        obtain ECR token and build a docker-registry Secret for the namespace,
+      • a pullcheck Pod in the *cluster* namespace using the target image
+        to verify the cluster can actually pull it — unless the same pull
+        (cluster, namespace, image, credentials) was verified recently.
+      • (public ECR) the same pullcheck without a secret.
+
+    Nothing is applied here; the caller batches the manifests with its own.
+    Returns (plan, exit_code) — non-zero exit aborts Helm release.
     """
+    from .aws import parse_ecr_image_ref, aws_sts_identity, ecr_get_login_password
+
+    plan = _PullPreflight()
     image_ref = f"{image_repo}:{tag}"
     parts = parse_ecr_image_ref(image_ref)
 
     if not parts:
         console.warn("Image does not look like an ECR reference; skipping ECR-specific preflight.")
-        return [], 0
+        return plan, 0
+
+    if not _have("kubectl"):
+        console.error("kubectl is required for image pull preflight.")
+        return plan, 127
 
     host = str(parts["host"])
     region = str(parts.get("region") or "")
@@ -361,40 +602,44 @@ def _preflight_ecr_for_k8s_pull(*, namespace: str, image_repo: str, tag: str, re
     if secret_name:
         console.info(f"Secret:   {secret_name}")
 
+    password = ""
     if is_private:
         if not region:
             console.error("Could not determine AWS region from ECR host.")
-            return [], 1
-
-        rc, _ = aws_sts_identity(region)
-        if rc != 0:
-            console.error("AWS identity check failed; cannot verify cluster pull.")
-            return [], rc
-
-        rc, password = ecr_get_login_password(region)
-        if rc != 0 or not password:
-            console.error("Failed to get ECR login password; cannot verify cluster pull.")
-            return [], rc or 1
-
-        rc = _ensure_ecr_pull_secret(namespace, secret_name, host, password)
-        if rc != 0:
-            console.error("Failed to provision image pull secret in the cluster namespace.")
-            return [], rc
-
-        _adopt_for_helm(namespace, "secret", secret_name, release_name)
-
-        rc = _verify_namespace_can_pull_image(ns=namespace, image=image_ref, release_name=release_name, secret=secret_name)
-        if rc != 0:
-            return [], rc
-
-        return (["--set", f"imagePullSecrets[0]={secret_name}"], 0)
-
-
-    console.info("Public ECR image detected; verifying pull without a secret…")
-    rc = _verify_namespace_can_pull_image(ns=namespace, image=image_ref, release_name=release_name, secret=None)
-    if rc != 0:
-        return [], rc
-    return [], 0
+            return plan, 1
+
+        password = _cached_ecr_password(region) or ""
+        if not password:
+            rc, _ = aws_sts_identity(region)
+            if rc != 0:
+                console.error("AWS identity check failed; cannot verify cluster pull.")
+                return plan, rc
+
+            rc, password = ecr_get_login_password(region)
+            if rc != 0 or not password:
+                console.error("Failed to get ECR login password; cannot verify cluster pull.")
+                return plan, rc or 1
+            _store_ecr_password(region, password)
+
+        plan.docs.append(_write_dockerconfigjson_secret_yaml(
+            ns=namespace, name=secret_name, registry=host, username="AWS", password=password,
+            release_name=release_name,
+        ))
+        plan.helm_sets = ["--set", f"imagePullSecrets[0]={secret_name}"]
+    else:
+        console.info("Public ECR image detected; verifying pull without a secret…")
+
+    plan.verify_key = _pullcheck_key(namespace, image_ref, password)
+    if _recently_verified(plan.verify_key):
+        console.info("Cluster pull of this image was verified in the last 10 minutes; skipping pullcheck pod.")
+        return plan, 0
+    if _image_present_on_all_nodes(image_ref):
+        console.info("Skipping pullcheck — image already cached on all nodes.")
+        return plan, 0
+
+    plan.pod = f"pullcheck-{release_name}-{_rand_suffix()}"
+    plan.docs.append(_write_pullcheck_pod_yaml(ns=namespace, name=plan.pod, image=image_ref, secret=secret_name))
+    return plan, 0
 
 
 def release(env_name: str) -> int:
@@ -428,12 +673,13 @@ def release(env_name: str) -> int:
         console.tip("Set plsr_HELM_DIR to override or ensure plsr/helm exists.")
         return 2
 
-    name, ver = _name_version(cfg_text, app_root)
-    flavor = _flavor(cfg_text)
+    cfg = _load_cfg(app_root)
+    name, ver = _name_version(cfg, app_root)
+    flavor = _flavor(cfg)
 
-    image_repo = _image_repository(cfg_text, name)
+    image_repo = _image_repository(cfg)
     if not image_repo:
-        ecr = _ecr_root(cfg_text)
+        ecr = _ecr_root(cfg_text, cfg)
         if ecr:
             image_repo = f"{ecr.rstrip('/')}/{name}"
         else:
@@ -442,25 +688,46 @@ def release(env_name: str) -> int:
             return 2
 
     namespace = f"{env_name}"
-    root_pw, db_name, db_user, db_pw = _db_env_values(cfg_text, env_name)
-
-    if _ensure_namespace(namespace) != 0:
-        return 1
+    root_pw, db_name, db_user, db_pw = _db_env_values(cfg, env_name)
 
     release_name = name
     root_secret = f"{name}-root-{env_name}"
 
-    _apply_opaque_secret(namespace, root_secret, {"ROOT_DB_PW": root_pw})
-    _adopt_for_helm(namespace, "secret", root_secret, release_name)
-
-
-    extra_sets, rc = _preflight_ecr_for_k8s_pull(
+    pull, rc = _preflight_ecr_for_k8s_pull(
         namespace=namespace, image_repo=image_repo, tag=ver, release_name=release_name
     )
     if rc != 0:
         console.error("Aborting Helm release: cluster cannot pull the image from the registry (preflight failed).")
         return rc
 
+    if not _have("kubectl"):
+        console.warn("kubectl not found on PATH; relying on Helm to create namespace.")
+        console.warn(f"Secret {root_secret} was not created.")
+    else:
+        # Namespace, Helm-owned secrets and the pullcheck pod in one kubectl apply.
+        docs = [
+            _write_namespace_yaml(namespace),
+            _write_opaque_secret_yaml(
+                ns=namespace, name=root_secret, kv={"ROOT_DB_PW": root_pw}, release_name=release_name
+            ),
+            *pull.docs,
+        ]
+        try:
+            rc = _apply_manifests(docs)
+            if rc != 0:
+                console.error("Failed to apply namespace/secrets to the cluster.")
+                return rc
+            if pull.pod:
+                rc = _await_image_pull(ns=namespace, pod_name=pull.pod)
+                if rc != 0:
+                    console.error("Aborting Helm release: cluster cannot pull the image from the registry (preflight failed).")
+                    return rc
+                if pull.verify_key:
+                    _mark_verified(pull.verify_key)
+        finally:
+            if pull.pod:
+                _delete_pod(namespace, pull.pod)
+
     timeout = os.getenv("plsr_HELM_TIMEOUT", "5m")
     cmd: list[str] = [
         "helm", "upgrade", "--install", release_name, str(helm_dir),
@@ -474,7 +741,7 @@ def release(env_name: str) -> int:
         "--set-string", "persistentVolume.size=10Gi",
     ]
 
-    cmd.extend(extra_sets)
+    cmd.extend(pull.helm_sets)
 
     if flavor == "db-mariadb":
         cmd += [
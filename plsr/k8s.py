@@ -2,6 +2,7 @@ import os
 import sys
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from plsr.console import console
@@ -26,6 +27,18 @@ def deploy_exists(namespace: str, deploy_name: str) -> bool:
     )
     return result.returncode == 0
 
+def existing_deploys(namespace: str, deploy_names: list[str]) -> set[str]:
+    """
+    Which of `deploy_names` exist in `namespace`, from a single kubectl call.
+    """
+    result = subprocess.run(
+        ["kubectl", "-n", namespace, "get", "deploy", *deploy_names, "-o", "name", "--ignore-not-found"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    if result.returncode != 0:
+        return set()
+    return {line.rpartition("/")[2] for line in result.stdout.split() if line}
+
 def clusterissuer_exists() -> bool:
     result = subprocess.run(
         ["kubectl", "get", "clusterissuer", CLUSTER_ISSUER_NAME],
@@ -58,7 +71,7 @@ def install_cert_manager():
     if not require_kubectl():
         sys.exit(1)
     deployments = ["cert-manager", "cert-manager-webhook", "cert-manager-cainjector"]
-    if all(deploy_exists("cert-manager", d) for d in deployments):
+    if existing_deploys("cert-manager", deployments) >= set(deployments):
         console.info("cert-manager is already installed (deployments present). Skipping.")
         return
     console.section("Installing cert-manager (pinned)")
@@ -66,12 +79,15 @@ def install_cert_manager():
     if code != 0:
         sys.exit(code)
     console.info("Waiting for cert-manager components to be ready...")
-    subprocess.run(["kubectl", "-n", "cert-manager", "rollout", "status",
-                    "deploy/cert-manager", "--timeout=5m"], check=False)
-    subprocess.run(["kubectl", "-n", "cert-manager", "rollout", "status",
-                    "deploy/cert-manager-webhook", "--timeout=5m"], check=False)
-    subprocess.run(["kubectl", "-n", "cert-manager", "rollout", "status",
-                    "deploy/cert-manager-cainjector", "--timeout=5m"], check=False)
+    # The three roll out together in-cluster, so wait on them side by side.
+    with ThreadPoolExecutor(max_workers=len(deployments)) as ex:
+        waits = [
+            ex.submit(subprocess.run, ["kubectl", "-n", "cert-manager", "rollout", "status",
+                                       f"deploy/{d}", "--timeout=5m"], check=False)
+            for d in deployments
+        ]
+        for w in waits:
+            w.result()
 
 def apply_clusterissuer():
     if not require_kubectl():
@@ -88,11 +104,15 @@ def apply_clusterissuer():
 def setup():
     if not require_kubectl():
         sys.exit(1)
-    if (deploy_exists("ingress-nginx", "ingress-nginx-controller")
-            and deploy_exists("cert-manager", "cert-manager")
-            and deploy_exists("cert-manager", "cert-manager-webhook")
-            and deploy_exists("cert-manager", "cert-manager-cainjector")
-            and clusterissuer_exists()):
+    cert_manager = ["cert-manager", "cert-manager-webhook", "cert-manager-cainjector"]
+    # One kubectl per namespace plus the ClusterIssuer lookup, run side by side.
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        ingress_f = ex.submit(existing_deploys, "ingress-nginx", ["ingress-nginx-controller"])
+        certmgr_f = ex.submit(existing_deploys, "cert-manager", cert_manager)
+        issuer_f = ex.submit(clusterissuer_exists)
+    if ("ingress-nginx-controller" in ingress_f.result()
+            and certmgr_f.result() >= set(cert_manager)
+            and issuer_f.result()):
         console.info("Kubernetes ingress stack already installed (Ingress, cert-manager, ClusterIssuer). Nothing to do.")
         console.info("Current LB Service:")
         subprocess.run(["kubectl", "-n", "ingress-nginx", "get", "svc", "ingress-nginx-controller", "-o", "wide"], check=False)
@@ -2,61 +2,167 @@ from __future__ import annotations
 
 import os
 import re
+import json
 import sys
-import shutil
 import shlex
-import socket
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Tuple
 
 from .console import console
 
-try:
-    import tomllib as _toml
-except Exception:
-    try:
-        import tomli as _toml
-    except Exception:
-        _toml = None
+# yaml, tomllib, socket and shutil are imported where they are used: a cached
+# config or a dry run never needs them. subprocess/shlex are already loaded by
+# console, so they stay here.
 
 
-def _app_root() -> Path:
-    env = os.getenv("APP_ROOT")
-    if env:
-        p = Path(env).resolve()
+@lru_cache(maxsize=4)
+def _app_root_cached(cwd: str, env_root: str | None) -> Path:
+    if env_root:
+        p = Path(env_root).resolve()
         if p.is_dir():
             return p
-    cur = Path.cwd().resolve()
+    cur = Path(cwd).resolve()
     for p in (cur, *cur.parents):
         if (p / "config.yaml").is_file():
             return p
     return cur
 
+def _app_root() -> Path:
+    # Keyed on CWD and APP_ROOT so a chdir or env change still re-resolves.
+    return _app_root_cached(os.getcwd(), os.getenv("APP_ROOT"))
+
+@lru_cache(maxsize=8)
+def _read_config_text_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    try:
+        with open(path_str, encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    except Exception:
+        return ""
+
 def _read_config_text(root: Path) -> str:
     p = root / "config.yaml"
-    if not p.is_file():
+    try:
+        st = os.stat(p)
+    except OSError:
         return ""
+    return _read_config_text_cached(str(p), st.st_mtime_ns, st.st_size)
+
+def _config_cache_path(cfg_path: Path) -> Path:
+    return cfg_path.parent / ".plsr" / "config.json"
+
+def _read_config_cache(path: Path, mtime_ns: int, size: int) -> dict | None:
+    """
+    Parsed config from a previous run, if it was written for this exact
+    config.yaml (same mtime and size); None otherwise.
+    """
+    try:
+        blob = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(blob, dict) or blob.get("mtime_ns") != mtime_ns or blob.get("size") != size:
+        return None
+    data = blob.get("data")
+    return data if isinstance(data, dict) else None
+
+def _write_config_cache(path: Path, mtime_ns: int, size: int, data: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"mtime_ns": mtime_ns, "size": size, "data": data}, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+@lru_cache(maxsize=8)
+def _load_config_cached(path_str: str, mtime_ns: int, size: int) -> dict | None:
+    """
+    Parse config.yaml once per (path, mtime, size) with PyYAML's (C)BaseLoader
+    so scalars stay strings. The result is also kept in .plsr/config.json and
+    reused by later runs while config.yaml is unchanged, skipping the YAML parse.
+    Returns None when there is no usable cache and PyYAML is missing or the
+    file is not a YAML mapping; callers then fall back to the regex readers.
+    """
+    cache = _config_cache_path(Path(path_str))
+    data = _read_config_cache(cache, mtime_ns, size)
+    if data is not None:
+        return data
+    try:
+        import yaml as _yaml
+    except ImportError:
+        return None
+    loader = getattr(_yaml, "CBaseLoader", None) or _yaml.BaseLoader
     try:
-        return p.read_text(encoding="utf-8", errors="ignore")
+        data = _yaml.load(_read_config_text_cached(path_str, mtime_ns, size), Loader=loader)
     except Exception:
-        return ""
+        return None
+    if not isinstance(data, dict):
+        return None
+    _write_config_cache(cache, mtime_ns, size, data)
+    return data
+
+def _load_config(root: Path) -> dict | None:
+    cfg = root / "config.yaml"
+    try:
+        st = os.stat(cfg)
+    except OSError:
+        return None
+    return _load_config_cached(str(cfg), st.st_mtime_ns, st.st_size)
+
+def _cfg_str(cfg: dict | None, *path: str) -> Optional[str]:
+    cur = cfg
+    for key in path:
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(key)
+    if not isinstance(cur, str):
+        return None
+    return cur.strip() or None
+
+_RE_PKG_UNSAFE = re.compile(r"[^A-Za-z0-9_]")
+
+@lru_cache(maxsize=64)
+def _compile_block(section: str) -> re.Pattern[str]:
+    return re.compile(rf"(?ms)^\s*{re.escape(section)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)")
+
+@lru_cache(maxsize=64)
+def _compile_kv(key: str) -> re.Pattern[str]:
+    return re.compile(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$")
 
 def _extract_block(text: str, section: str) -> str:
-    m = re.search(rf"(?ms)^\s*{re.escape(section)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", text)
+    m = _compile_block(section).search(text)
     return m.group("blk") if m else ""
 
 def _kv_from_block(block: str, key: str) -> Optional[str]:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", block)
+    m = _compile_kv(key).search(block)
     return m.group(1).strip() if m else None
 
 def _kv_top(text: str, key: str) -> Optional[str]:
-    m = re.search(rf"(?mi)^\s*{re.escape(key)}\s*:\s*['\"]?([^#\r\n'\"]+)['\"]?\s*(?:#.*)?$", text)
+    m = _compile_kv(key).search(text)
     return m.group(1).strip() if m else None
 
-def _detect_flavor(text: str) -> str:
-    svc = _extract_block(text, "service")
-    fl = (_kv_from_block(svc, "flavor") or "").lower().strip()
+def _to_port(val: Optional[str]) -> Optional[int]:
+    if not val:
+        return None
+    try:
+        return int(str(val).strip())
+    except Exception:
+        return None
+
+def _config_name(cfg: dict | None, text: str) -> Optional[str]:
+    if cfg is not None:
+        return _cfg_str(cfg, "name")
+    return _kv_top(text, "name")
+
+def _detect_flavor(cfg: dict | None, text: str) -> str:
+    if cfg is not None:
+        fl = (_cfg_str(cfg, "service", "flavor") or "").lower()
+    else:
+        fl = (_kv_from_block(_extract_block(text, "service"), "flavor") or "").lower().strip()
     if fl in ("mariadb", "mysql", "db-mariadb", "db_mysql"):
         return "db-mariadb"
     return "python-app"
@@ -65,36 +171,60 @@ def _env_block(text: str, env_name: str) -> str:
     envs = _extract_block(text, "environments")
     if not envs:
         return ""
-    m = re.search(rf"(?ms)^\s*{re.escape(env_name)}\s*:\s*\n(?P<blk>(?:[ \t].*\n)+)", envs)
+    m = _compile_block(env_name).search(envs)
     return m.group("blk") if m else ""
 
-def _env_port(text: str, env_name: str) -> Optional[int]:
+def _env_port(cfg: dict | None, text: str, env_name: str) -> Optional[int]:
+    if cfg is not None:
+        return _to_port(_cfg_str(cfg, "environments", env_name, "port"))
     blk = _env_block(text, env_name)
-    p = _kv_from_block(blk, "port") if blk else None
-    if not p:
-        return None
-    try:
-        return int(str(p).strip())
-    except Exception:
-        return None
+    return _to_port(_kv_from_block(blk, "port") if blk else None)
 
-def _default_app_port(text: str) -> int:
-    default = _extract_block(text, "default")
-    p = _kv_from_block(default, "APP_PORT")
-    try:
-        return int(str(p).strip()) if p else 8000
-    except Exception:
-        return 8000
+def _default_app_port(cfg: dict | None, text: str) -> int:
+    if cfg is not None:
+        p = _cfg_str(cfg, "default", "APP_PORT")
+    else:
+        p = _kv_from_block(_extract_block(text, "default"), "APP_PORT")
+    return _to_port(p) or 8000
 
 def _sanitize_pkg(name: str) -> str:
-    return re.sub(r"[^A-Za-z0-9_]", "_", name).strip("_") or "app"
+    return _RE_PKG_UNSAFE.sub("_", name).strip("_") or "app"
+
+def _dir_files(d: Path) -> frozenset[str]:
+    """
+    Names of the regular files (or links to them) directly in `d`, from one
+    directory listing; empty if `d` is missing or unreadable.
+    """
+    try:
+        with os.scandir(d) as it:
+            return frozenset(e.name for e in it if e.is_file())
+    except OSError:
+        return frozenset()
+
 
-def _exists(p: Path) -> bool:
+@lru_cache(maxsize=8)
+def _pyproject_run_spec(path_str: str, mtime_ns: int):
+    """Raw [tool.plsr.run] command (str or list) from pyproject.toml, parsed once per (path, mtime)."""
     try:
-        return p.is_file()
+        import tomllib as _toml
+    except ImportError:
+        try:
+            import tomli as _toml
+        except ImportError:
+            return None
+    try:
+        with open(path_str, "rb") as f:
+            data = _toml.load(f)
     except Exception:
-        return False
+        return None
 
+    tool = data.get("tool") or {}
+    plsr = tool.get("plsr") or {}
+    run = plsr.get("run") or {}
+    cmd = run.get("command") or run.get("cmd")
+    if isinstance(cmd, list):
+        return tuple(cmd)
+    return cmd
 
 def _pyproject_run_command(root: Path, port: int, env_name: str) -> Optional[List[str]]:
     """
@@ -104,24 +234,17 @@ def _pyproject_run_command(root: Path, port: int, env_name: str) -> Optional[Lis
     then return that command with placeholders substituted.
     """
     pp = root / "pyproject.toml"
-    if _toml is None or not pp.is_file():
-        return None
     try:
-        data = _toml.loads(pp.read_text(encoding="utf-8"))
-    except Exception:
+        st = os.stat(pp)
+    except OSError:
         return None
-
-    tool = data.get("tool") or {}
-    plsr = tool.get("plsr") or {}
-    run = plsr.get("run") or {}
-    cmd = run.get("command") or run.get("cmd")
-
+    cmd = _pyproject_run_spec(str(pp), st.st_mtime_ns)
     if not cmd:
         return None
 
     if isinstance(cmd, str):
         tokens = shlex.split(cmd)
-    elif isinstance(cmd, list):
+    elif isinstance(cmd, tuple):
         tokens = [str(x) for x in cmd]
     else:
         return None
@@ -148,6 +271,7 @@ def _choose_host_command(
     cfg_text: str,
     env_name: str,
     service_name: str,
+    cfg: dict | None = None,
 ) -> Tuple[List[str], int]:
     """
     Build the command to run a Python app on host.
@@ -160,57 +284,61 @@ def _choose_host_command(
       4) final fallback: python -m <sanitized_name>.
     """
     pkg = _sanitize_pkg(service_name)
-    port = _env_port(cfg_text, env_name) or _default_app_port(cfg_text)
+    port = _env_port(cfg, cfg_text, env_name) or _default_app_port(cfg, cfg_text)
 
     cmd_from_pp = _pyproject_run_command(root, port, env_name)
     if cmd_from_pp:
         return (cmd_from_pp, port)
 
-    main_py = root / "main.py"
-    app_py = root / "app.py"
-    src_main = root / "src" / "main.py"
-    src_app = root / "src" / "app.py"
-    src_pkg_main = root / "src" / pkg / "main.py"
-    src_pkg_app = root / "src" / pkg / "app.py"
-    pkg_main = root / pkg / "main.py"
-    pkg_app = root / pkg / "app.py"
-    pkg_dunder_main = root / pkg / "__main__.py"
-    src_pkg_dunder_main = root / "src" / pkg / "__main__.py"
-
+    top = _dir_files(root)
+    src = _dir_files(root / "src")
+    src_pkg = _dir_files(root / "src" / pkg)
+    pkg_files = _dir_files(root / pkg)
 
-    if _exists(main_py):
+    if "main.py" in top:
         return ([sys.executable, "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
-    if _exists(app_py):
+    if "app.py" in top:
         return ([sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
-    if _exists(src_main):
+    if "main.py" in src:
         return ([sys.executable, "-m", "uvicorn", "src.main:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
-    if _exists(src_app):
+    if "app.py" in src:
         return ([sys.executable, "-m", "uvicorn", "src.app:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
-    if _exists(src_pkg_app):
+    if "app.py" in src_pkg:
         return ([sys.executable, "-m", "uvicorn", f"{pkg}.app:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
-    if _exists(pkg_app):
+    if "app.py" in pkg_files:
         return ([sys.executable, "-m", "uvicorn", f"{pkg}.app:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
-    if _exists(src_pkg_main):
+    if "main.py" in src_pkg:
         return ([sys.executable, "-m", "uvicorn", f"{pkg}.main:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
-    if _exists(pkg_main):
+    if "main.py" in pkg_files:
         return ([sys.executable, "-m", "uvicorn", f"{pkg}.main:app", "--host", "0.0.0.0", "--port", str(port), "--reload"], port)
 
-    if _exists(pkg_dunder_main) or _exists(src_pkg_dunder_main):
+    if "__main__.py" in pkg_files or "__main__.py" in src_pkg:
         return ([sys.executable, "-m", pkg], port)
-    if _exists(pkg_main) or _exists(src_pkg_main):
+    if "main.py" in pkg_files or "main.py" in src_pkg:
         return ([sys.executable, "-m", f"{pkg}.main"], port)
-    if _exists(pkg_app) or _exists(src_pkg_app):
+    if "app.py" in pkg_files or "app.py" in src_pkg:
         return ([sys.executable, "-m", f"{pkg}.app"], port)
 
-    if _exists(main_py):
+    if "main.py" in top:
         return ([sys.executable, "main.py"], port)
-    if _exists(app_py):
+    if "app.py" in top:
         return ([sys.executable, "app.py"], port)
 
     return ([sys.executable, "-m", pkg], port)
 
 
 def _is_port_free(port: int, host: str = "0.0.0.0") -> bool:
+    """
+    A loopback connect that succeeds means something is listening; that is
+    the definitive "busy" answer and also catches listeners the SO_REUSEADDR
+    bind below would step past on BSD/macOS. Otherwise the bind decides, so
+    listeners on other interfaces are still seen.
+    """
+    import socket
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.settimeout(0.05)
+        if probe.connect_ex(("127.0.0.1", port)) == 0:
+            return False
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -219,6 +347,11 @@ def _is_port_free(port: int, host: str = "0.0.0.0") -> bool:
     except OSError:
         return False
 
+@lru_cache(maxsize=8)
+def _have(cmd: str) -> bool:
+    import shutil
+    return shutil.which(cmd) is not None
+
 def _kill_pids_posix(pids: list[int]) -> None:
     import signal
     for pid in pids:
@@ -227,21 +360,79 @@ def _kill_pids_posix(pids: list[int]) -> None:
         except Exception:
             pass
 
+def _proc_listen_inodes(port: int) -> set[str] | None:
+    """
+    Socket inodes in LISTEN state on TCP `port`, from /proc/net/tcp and tcp6.
+    None when procfs is not available (non-Linux).
+    """
+    inodes: set[str] = set()
+    seen = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, encoding="ascii", errors="ignore") as f:
+                next(f, None)
+                for line in f:
+                    parts = line.split()
+                    # sl local_address rem_address st ... uid timeout inode
+                    if len(parts) < 10 or parts[3] != "0A" or parts[9] == "0":
+                        continue
+                    if int(parts[1].rpartition(":")[2], 16) == port:
+                        inodes.add(parts[9])
+            seen = True
+        except (OSError, ValueError):
+            continue
+    return inodes if seen else None
+
+def _proc_pids_for_inodes(inodes: set[str]) -> list[int]:
+    """PIDs holding any of the given socket inodes open (only processes we may inspect)."""
+    targets = {f"socket:[{i}]" for i in inodes}
+    pids: list[int] = []
+    try:
+        procs = [e.name for e in os.scandir("/proc") if e.name.isdigit()]
+    except OSError:
+        return pids
+    for pid in procs:
+        fd_dir = f"/proc/{pid}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                if os.readlink(f"{fd_dir}/{fd}") in targets:
+                    pids.append(int(pid))
+                    break
+            except OSError:
+                continue
+    return pids
+
+def _listener_pids_posix(port: int) -> list[int] | None:
+    """
+    PIDs listening on `port`: procfs on Linux (no fork), `lsof -t` elsewhere.
+    None when neither is available.
+    """
+    inodes = _proc_listen_inodes(port)
+    if inodes is not None:
+        return _proc_pids_for_inodes(inodes) if inodes else []
+    if not _have("lsof"):
+        return None
+    res = subprocess.run(["lsof", "-t", f"-i:{port}"], capture_output=True, text=True)
+    return [int(x) for x in (res.stdout or "").split() if x.strip().isdigit()]
+
 def _free_port(port: int) -> int:
     """
     Try to free a port by killing listeners (local.sh parity).
-    POSIX: lsof; Windows: netstat + taskkill.
+    Linux: /proc/net/tcp; other POSIX: lsof; Windows: netstat + taskkill.
     """
     if _is_port_free(port):
         return 0
 
     if os.name != "nt":
-        if shutil.which("lsof") is None:
-            console.warn(f"lsof not found; cannot auto-free port {port}.")
-            return 1
         try:
-            res = subprocess.run(["lsof", "-t", f"-i:{port}"], capture_output=True, text=True)
-            pids = [int(x) for x in (res.stdout or "").split() if x.strip().isdigit()]
+            pids = _listener_pids_posix(port)
+            if pids is None:
+                console.warn(f"lsof not found; cannot auto-free port {port}.")
+                return 1
             if not pids:
                 return 1
             console.info(f"Attempting to kill listeners on port {port}: {pids}")
@@ -271,6 +462,24 @@ def _free_port(port: int) -> int:
     return 0 if _is_port_free(port) else 1
 
 
+_PYCACHE_SKIP_DIRS = frozenset((".git", ".venv", "node_modules"))
+
+def _rmtree_fast(path: str) -> None:
+    """__pycache__ is a flat dir of .pyc files: unlink them and rmdir; rmtree only if it is not."""
+    import shutil
+    if os.path.islink(path):
+        return
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    shutil.rmtree(path, ignore_errors=True)
+                    return
+                os.unlink(e.path)
+        os.rmdir(path)
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+
 def _remove_pycache_dirs(root: Path) -> None:
     keep = os.getenv("plsr_CLEANUP_PYCACHE", "1").strip().lower() in ("1", "true", "yes", "y")
     if not keep:
@@ -278,11 +487,11 @@ def _remove_pycache_dirs(root: Path) -> None:
         return
     console.info("Removing __pycache__ directories…")
     try:
-        for p in root.rglob("__pycache__"):
-            try:
-                shutil.rmtree(p, ignore_errors=True)
-            except Exception:
-                pass
+        for dirpath, dirnames, _ in os.walk(root):
+            if "__pycache__" in dirnames:
+                dirnames.remove("__pycache__")
+                _rmtree_fast(os.path.join(dirpath, "__pycache__"))
+            dirnames[:] = [d for d in dirnames if d not in _PYCACHE_SKIP_DIRS]
     except Exception:
         pass
 
@@ -291,6 +500,7 @@ def _remove_repo_venv(root: Path) -> None:
     if not keep:
         console.info("Keeping repo venv (plsr_CLEANUP_REPO_VENV=0).")
         return
+    import shutil
     for name in (".venv", "venv"):
         v = root / name
         if v.is_dir():
@@ -306,16 +516,22 @@ def auto_run(
     *,
     env_name: str,
     dry_run: bool = False,
+    ctx=None,
 ) -> int:
     """
     Run the microservice directly on the host (no Docker).
     For DB services, this is intentionally disabled.
     Always performs cleanup (pycache + .venv) on exit for Python apps.
+    `ctx` is the AppContext from app.start(); its root is reused when it holds config.yaml.
     """
-    root = _app_root()
-    cfg = _read_config_text(root)
-    name = _kv_top(cfg, "name") or root.name
-    flavor = _detect_flavor(cfg or "")
+    if ctx is not None and (ctx.root / "config.yaml").is_file():
+        root = ctx.root
+    else:
+        root = _app_root()
+    cfg = _load_config(root)
+    cfg_text = "" if cfg is not None else _read_config_text(root)
+    name = _config_name(cfg, cfg_text) or root.name
+    flavor = _detect_flavor(cfg, cfg_text)
 
     console.section("Host Runtime")
     console.info(f"Env:    {env_name}")
@@ -328,7 +544,7 @@ def auto_run(
         console.tip("Run the container instead:  plsr docker run local")
         return 2
 
-    cmd, port = _choose_host_command(root=root, cfg_text=cfg or "", env_name=env_name, service_name=name)
+    cmd, port = _choose_host_command(root=root, cfg_text=cfg_text, env_name=env_name, service_name=name, cfg=cfg)
 
     env = os.environ.copy()
     env.setdefault("ENV", env_name)
@@ -7,7 +7,7 @@ import shutil
 import socket
 import subprocess
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Optional, Sequence, Tuple, List
 
 from .console import console
 from .aws import ensure_image_pullable
@@ -287,8 +287,8 @@ def auto_run(
     env_name: str,
     image_override: Optional[str] = None,
     name_override: Optional[str] = None,
-    port_overrides: List[str] | None = None,
-    env_overrides: List[str] | None = None,
+    port_overrides: Sequence[str] | None = None,
+    env_overrides: Sequence[str] | None = None,
     data_host_dir: Optional[str] = None,
     detach: bool = True,
     force_pull: bool = False,
@@ -11,8 +11,8 @@ from typing import Dict, Iterable, List, Optional, Tuple
 
 from ..core.console import console
 
-_PRIV_ECR_HOST = re.compile(r"(?P<host>(?P<acct>\d{12})\.dkr\.ecr\.(?P<region>[a-z0-9-]+)\.amazonaws\.com)")
-_PUB_ECR_HOST = re.compile(r"(?:^|/)(public\.ecr\.aws)(?:/|$)")
+_PRIV_ECR_HOST = re.compile(r"(?P<host>(?P<acct>\d{12})\.dkr\.ecr\.(?P<region>[a-z0-9-]+)\.amazonaws\.com)", re.A)
+_PUB_ECR_HOST = re.compile(r"(?:^|/)(public\.ecr\.aws)(?:/|$)", re.A)
 _VAR_BRACE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
 _VAR_SIMPLE = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
 
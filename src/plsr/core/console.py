@@ -7,6 +7,9 @@ import sys
 import threading
 import time
 import signal
+import codecs
+import selectors
+from collections import deque
 from typing import Iterable, Sequence, Optional
 from datetime import datetime
 from subprocess import Popen, PIPE, STDOUT
@@ -45,15 +48,19 @@ class _Style:
     }
 
 
+def _stdout_isatty() -> bool:
+    try:
+        return sys.stdout.isatty()
+    except Exception:
+        return False
+
+
 def _supports_color() -> bool:
     if os.getenv("NO_COLOR"):
         return False
     if os.getenv("TERM") == "dumb":
         return False
-    try:
-        return sys.stdout.isatty()
-    except Exception:
-        return False
+    return _stdout_isatty()
 
 
 _enable_windows_ansi()
@@ -75,6 +82,98 @@ def _c(text: str, color: str | None = None, *, bold: bool = False, dim: bool = F
     return "".join(parts)
 
 
+_READ_CHUNK = 65536
+_PARTIAL_LINE_WAIT = 0.5
+
+
+def _pipe_size() -> int:
+    """
+    1 MiB child pipe on Linux (fewer writer stalls/context switches on chatty
+    builds), capped at the unprivileged limit; -1 keeps the OS default.
+    """
+    try:
+        with open("/proc/sys/fs/pipe-max-size") as f:
+            return min(1 << 20, int(f.read()))
+    except (OSError, ValueError):
+        return -1
+
+
+_PIPE_SIZE = _pipe_size()
+
+
+def _feed_stdin(stream, data: bytes) -> None:
+    try:
+        stream.write(data)
+        stream.close()
+    except (BrokenPipeError, OSError, ValueError):
+        pass
+
+
+def _iter_lines(stream) -> Iterable[str]:
+    """
+    Yield decoded lines from a binary pipe, reading whatever is available in
+    blocks (read1) and splitting in Python rather than readline() per line.
+    Newlines are normalised like text mode: \r\n and bare \r both end a line.
+    On POSIX a partial line (e.g. a prompt) is shown once the child has been
+    quiet for _PARTIAL_LINE_WAIT seconds instead of waiting for its newline.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    sel = None
+    if os.name != "nt":
+        sel = selectors.DefaultSelector()
+        sel.register(stream, selectors.EVENT_READ)
+    tail = ""
+    flushed = False
+    try:
+        while True:
+            if sel is not None and tail.rstrip("\r") and not sel.select(_PARTIAL_LINE_WAIT):
+                yield tail.rstrip("\r")
+                tail, flushed = "", True
+                continue
+            chunk = stream.read1(_READ_CHUNK)
+            if not chunk:
+                break
+            text = decoder.decode(chunk)
+            if flushed:
+                # The terminator of a line we already showed as partial.
+                for nl in ("\r\n", "\n", "\r"):
+                    if text.startswith(nl):
+                        text = text[len(nl):]
+                        break
+                flushed = not text
+            text = tail + text
+            # A trailing \r may be the first half of \r\n; decide once more data arrives.
+            held = ""
+            if text.endswith("\r"):
+                text, held = text[:-1], "\r"
+            *lines, tail = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            tail += held
+            yield from lines
+    finally:
+        if sel is not None:
+            sel.close()
+    rest = (tail + decoder.decode(b"", final=True)).replace("\r\n", "\n").replace("\r", "\n")
+    if rest:
+        yield from rest.rstrip("\n").split("\n")
+
+
+# Same "needs quoting" test shlex.quote applies.
+_UNSAFE_ARG_RX = re.compile(r"[^\w@%+=:,./-]", re.ASCII)
+
+# Line highlighting in Console.run; errors win over progress markers.
+_ERROR_LINE_RX = re.compile(r"ERROR|Error:|(?i:failed to)")
+_DONE_LINE_RX = re.compile(r"CACHED|DONE|FINISHED")
+_ECR_HOST_RX = re.compile(r"[0-9]{12}\.dkr\.ecr\.([a-z0-9-]+)\.amazonaws\.com", re.A)
+
+# level -> (glyph, colour, retro no-colour tag); info has no glyph
+_LEVEL_GLYPHS = {
+    "success": ("✔", "green", "[SUCCESS]"),
+    "warn": ("▲", "yellow", "[WARN]"),
+    "error": ("✖", "red", "[ERROR]"),
+    "tip": ("➤", "magenta", "[TIP]"),
+}
+
+
 class Console:
     """
     Small, dependency-free console helper:
@@ -84,73 +183,65 @@ class Console:
       - Lightweight error highlighting and ECR auth hint
       - Graceful Ctrl+C handling for foreground processes
     """
-    def __init__(self) -> None:
-        self.theme = os.getenv("PULSAR_THEME", "neon").lower()
-        if self.theme == "neon":
-            self.prefix_raw = "[PULSAR]"
-            self.prefix_colored = "\x1b[95;1m[\x1b[96;1mPULSAR\x1b[95;1m]\x1b[0m" if _USE_COLOR else "[PULSAR]"
-        elif self.theme == "retro":
-            self.prefix_raw = "[PULSAR]"
-            self.prefix_colored = "\x1b[92;1m[PULSAR]\x1b[0m" if _USE_COLOR else "[PULSAR]"
-        else:
-            self.prefix_raw = "[pulsar]"
-            self.prefix_colored = _c(self.prefix_raw, "cyan", bold=True)
-        self._lock = threading.Lock()
+    def __init__(self, *, threadsafe: bool = True) -> None:
+        # Only serialise _out() when callers may log from several threads.
+        self._lock = threading.Lock() if threadsafe else None
+        # spinner()/progress() hold their own lock so they don't block log lines for `duration`.
+        self._render_lock = threading.Lock()
+        self.set_theme(os.getenv("PULSAR_THEME", "neon"))
 
 
     def _out(self, msg: str) -> None:
+        # One write per message. Off a TTY, CPython already block-buffers
+        # sys.stdout, so this does not turn into a syscall per line.
+        if self._lock is None:
+            sys.stdout.write(msg + "\n")
+            return
         with self._lock:
-            print(msg)
+            sys.stdout.write(msg + "\n")
 
-    def info(self, msg: str) -> None:
+    def _affixes(self, level: str) -> tuple[str, str]:
+        """
+        (prefix, suffix) wrapped around messages of `level` in the current theme.
+        """
+        glyph = _LEVEL_GLYPHS.get(level)
         if self.theme == 'retro':
-            with self._lock:
-                if _USE_COLOR:
-                    print(f"\x1b[32m{self.prefix_raw} {msg}\x1b[0m")
-                else:
-                    print(f"{self.prefix_raw} {msg}")
-            return
-        self._out(f"{self.prefix_colored} {msg}")
+            if _USE_COLOR:
+                mark = f"{glyph[0]} " if glyph else ""
+                return f"\x1b[32m{self.prefix_raw} {mark}", "\x1b[0m"
+            mark = f"{glyph[2]} " if glyph else ""
+            return f"{self.prefix_raw} {mark}", ""
+        if glyph:
+            return f"{self.prefix_colored} {_c(glyph[0], glyph[1], bold=True)} ", ""
+        return f"{self.prefix_colored} ", ""
+
+    def _line(self, level: str, msg: str) -> str:
+        """
+        Format one log line for `level` (info/success/warn/error/tip) in the current theme.
+        """
+        pre, post = self._level_affixes[level]
+        return f"{pre}{msg}{post}"
+
+    def lines(self, *entries: tuple[str, str]) -> None:
+        """
+        Print several (level, msg) lines with a single write.
+        """
+        self._out("\n".join(self._line(level, msg) for level, msg in entries))
+
+    def info(self, msg: str) -> None:
+        self._out(self._line("info", msg))
 
     def success(self, msg: str) -> None:
-        if self.theme == 'retro':
-            with self._lock:
-                if _USE_COLOR:
-                    print(f"\x1b[32m{self.prefix_raw} ✔ {msg}\x1b[0m")
-                else:
-                    print(f"{self.prefix_raw} [SUCCESS] {msg}")
-            return
-        self._out(f"{self.prefix_colored} {_c('✔', 'green', bold=True)} {msg}")
+        self._out(self._line("success", msg))
 
     def warn(self, msg: str) -> None:
-        if self.theme == 'retro':
-            with self._lock:
-                if _USE_COLOR:
-                    print(f"\x1b[32m{self.prefix_raw} ▲ {msg}\x1b[0m")
-                else:
-                    print(f"{self.prefix_raw} [WARN] {msg}")
-            return
-        self._out(f"{self.prefix_colored} {_c('▲', 'yellow', bold=True)} {msg}")
+        self._out(self._line("warn", msg))
 
     def error(self, msg: str) -> None:
-        if self.theme == 'retro':
-            with self._lock:
-                if _USE_COLOR:
-                    print(f"\x1b[32m{self.prefix_raw} ✖ {msg}\x1b[0m")
-                else:
-                    print(f"{self.prefix_raw} [ERROR] {msg}")
-            return
-        self._out(f"{self.prefix_colored} {_c('✖', 'red', bold=True)} {msg}")
+        self._out(self._line("error", msg))
 
     def tip(self, msg: str) -> None:
-        if self.theme == 'retro':
-            with self._lock:
-                if _USE_COLOR:
-                    print(f"\x1b[32m{self.prefix_raw} ➤ {msg}\x1b[0m")
-                else:
-                    print(f"{self.prefix_raw} [TIP] {msg}")
-            return
-        self._out(f"{self.prefix_colored} {_c('➤', 'magenta', bold=True)} {msg}")
+        self._out(self._line("tip", msg))
 
     def hr(self, title: str | None = None) -> None:
         width = 80
@@ -169,15 +260,10 @@ class Console:
             bottom = "╚" + "═" * (width - 2) + "╝"
             text_line = f"{title} @ {ts}"
             content = "║" + text_line.center(width - 2) + "║"
-            with self._lock:
-                if _USE_COLOR:
-                    print(f"\x1b[35m{top}\x1b[0m")
-                    print(f"\x1b[96;1m{content}\x1b[0m")
-                    print(f"\x1b[35m{bottom}\x1b[0m")
-                else:
-                    print(top)
-                    print(content)
-                    print(bottom)
+            if _USE_COLOR:
+                self._out(f"\x1b[35m{top}\x1b[0m\n\x1b[96;1m{content}\x1b[0m\n\x1b[35m{bottom}\x1b[0m")
+            else:
+                self._out(f"{top}\n{content}\n{bottom}")
             return
         if self.theme == 'retro':
             width = 80
@@ -185,15 +271,10 @@ class Console:
             bottom = top
             text_line = f"{title} @ {ts}"
             content = "|" + text_line.center(width - 2) + "|"
-            with self._lock:
-                if _USE_COLOR:
-                    print(f"\x1b[32m{top}\x1b[0m")
-                    print(f"\x1b[32m{content}\x1b[0m")
-                    print(f"\x1b[32m{bottom}\x1b[0m")
-                else:
-                    print(top)
-                    print(content)
-                    print(bottom)
+            if _USE_COLOR:
+                self._out(f"\x1b[32m{top}\x1b[0m\n\x1b[32m{content}\x1b[0m\n\x1b[32m{bottom}\x1b[0m")
+            else:
+                self._out(f"{top}\n{content}\n{bottom}")
             return
         self.hr()
         self._out(f"{self.prefix_colored} {_c(title, 'white', bold=True)} {_c('@', 'gray')} {_c(ts, 'gray')}")
@@ -204,7 +285,11 @@ class Console:
         if isinstance(cmd, str):
             return cmd
         try:
-            return shlex.join(list(cmd))
+            args = list(cmd)
+            # Common case: nothing needs quoting, so skip shlex.quote per arg.
+            if all(a and not _UNSAFE_ARG_RX.search(a) for a in args):
+                return " ".join(args)
+            return shlex.join(args)
         except Exception:
             return " ".join(cmd)
 
@@ -214,10 +299,19 @@ class Console:
             self.info(f"Running: {_c(cmd_str, 'gray')} {_c('(cwd=' + str(cwd) + ')', 'gray', dim=True)}")
         else:
             self.info(f"Running: {_c(cmd_str, 'gray')}")
-
-    def run(self, cmd: Sequence[str] | str, cwd: Optional[str | os.PathLike] = None, env: Optional[dict] = None) -> int:
+        # The command may inherit our stdout; get the echo out ahead of its output.
+        sys.stdout.flush()
+
+    def run(
+        self,
+        cmd: Sequence[str] | str,
+        cwd: Optional[str | os.PathLike] = None,
+        env: Optional[dict] = None,
+        input: Optional[bytes] = None,
+    ) -> int:
         """
         Run a command, streaming output. Returns the exit code.
+        - `input`, if given, is fed to the child's stdin (e.g. `kubectl apply -f -`)
         - Merges stderr into stdout to preserve order (great for docker buildx)
         - Highlights common error lines (skip in retro theme)
         - On failure, prints an ECR login hint if we detect a 403 against ECR
@@ -230,31 +324,38 @@ class Console:
             cmd if isinstance(cmd, (list, tuple)) else cmd,
             cwd=cwd,
             env=env,
+            stdin=PIPE if input is not None else None,
             stdout=PIPE,
             stderr=STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
+            bufsize=_READ_CHUNK,
+            pipesize=_PIPE_SIZE,
             shell=isinstance(cmd, str),
             start_new_session=(os.name != "nt"),
         )
 
-        recent: list[str] = []
+        # Tail of the output (~max_keep chars) for the ECR auth hint on failure.
+        recent: deque[str] = deque()
+        recent_len = 0
         max_keep = 5000
 
+        if input is not None:
+            # Feed stdin from a thread so a chatty child can't deadlock us on a full pipe.
+            threading.Thread(target=_feed_stdin, args=(proc.stdin, input), daemon=True).start()
+
         try:
             assert proc.stdout is not None
-            for raw in iter(proc.stdout.readline, ""):
-                line = raw.rstrip("\n")
-                recent.append(line + "\n")
-                while sum(len(x) for x in recent) > max_keep and recent:
-                    recent.pop(0)
+            for line in _iter_lines(proc.stdout):
+                kept = line + "\n"
+                recent.append(kept)
+                recent_len += len(kept)
+                while recent_len > max_keep and recent:
+                    recent_len -= len(recent.popleft())
 
                 out = line
                 if self.theme != 'retro':
-                    if "ERROR" in line or "Error:" in line or "failed to" in line.lower():
+                    if _ERROR_LINE_RX.search(line):
                         out = _c(line, "red")
-                    elif "CACHED" in line or "DONE" in line or "FINISHED" in line:
+                    elif _DONE_LINE_RX.search(line):
                         out = _c(line, "green")
                     elif line.startswith("=>"):
                         out = _c(line, "blue")
@@ -307,10 +408,9 @@ class Console:
         if ("amazonaws.com" in text) and (
             ("403 forbidden" in low) or ("denied" in low) or ("unauthorized" in low) or ("no basic auth credentials" in low)
         ):
-            m = re.search(r'([0-9]{12}\.dkr\.ecr\.[a-z0-9-]+\.amazonaws\.com)', text)
-            host = m.group(1) if m else "<your-ecr-registry>"
-            m2 = re.search(r'\.ecr\.([a-z0-9-]+)\.amazonaws\.com', host)
-            region = m2.group(1) if m2 else "<region>"
+            m = _ECR_HOST_RX.search(text)
+            host = m.group(0) if m else "<your-ecr-registry>"
+            region = m.group(1) if m else "<region>"
             self.tip(_c("ECR auth hint:", "magenta", bold=True))
             self.info("Login before building if the base image is private:")
             self._out(_c(f"  aws ecr get-login-password --region {region} | docker login --username AWS --password-stdin {host}", "gray"))
@@ -333,13 +433,17 @@ class Console:
         else:
             self.prefix_raw = "[pulsar]"
             self.prefix_colored = _c(self.prefix_raw, "cyan", bold=True)
+        # Level prefixes only change with the theme, so build them here once.
+        self._level_affixes = {level: self._affixes(level) for level in ("info", *_LEVEL_GLYPHS)}
 
     def spinner(self, text: str = "Loading", duration: float = 3.0) -> None:
-        """Display a simulated spinner animation for the specified duration."""
+        """Display a simulated spinner animation for the specified duration (TTY only)."""
+        if not _stdout_isatty():
+            return
         spinner_chars = "|/-\\"
         end_time = time.time() + duration
         idx = 0
-        with self._lock:
+        with self._render_lock:
             while time.time() < end_time:
                 char = spinner_chars[idx % len(spinner_chars)]
                 if self.theme == "neon":
@@ -356,11 +460,13 @@ class Console:
             sys.stdout.flush()
 
     def progress(self, total: int = 100, prefix: str = "Progress", bar_length: int = 50, fill_char: str = "█", duration: float = 5.0) -> None:
-        """Display a simulated progress bar from 0% to 100%."""
+        """Display a simulated progress bar from 0% to 100% (TTY only)."""
+        if not _stdout_isatty():
+            return
         if total <= 0:
             total = 1
         interval = duration / total
-        with self._lock:
+        with self._render_lock:
             for i in range(total + 1):
                 percent = int((i / total) * 100)
                 filled = int(bar_length * i / total)
@@ -378,7 +484,9 @@ class Console:
             sys.stdout.write("\n")
             sys.stdout.flush()
 
-console = Console()
+# The CLI logs from a single thread, and each message is one write() that the
+# buffered stdout already serialises, so the shared instance skips the lock.
+console = Console(threadsafe=False)
 
 def pulsar_log(msg: str) -> None:
     """